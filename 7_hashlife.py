@@ -0,0 +1,28 @@
+import argparse
+from led_matrix import create_strip
+from frame_pipeline import add_pipeline_arguments, run_pipeline
+from demos import HashLifeDemo
+
+parser = argparse.ArgumentParser(
+    prog="HashLife",
+    description="Look onto a huge Conway's Game of Life universe through the 32x8 pixel matrix",
+)
+parser.add_argument("-p", "--pattern", type=str, help="The RLE pattern file to load into the universe.", default="patterns/gosper_glider_gun.rle")
+parser.add_argument("-j", "--jump", type=int, help="Advance 2**jump generations between frames.", default=0)
+parser.add_argument("-x", type=int, help="The x position of the viewport, relative to the center of the pattern.", default=0)
+parser.add_argument("-y", type=int, help="The y position of the viewport, relative to the center of the pattern.", default=0)
+parser.add_argument("-dx", type=int, help="The number of cells to pan the viewport right on each frame.", default=0)
+parser.add_argument("-dy", type=int, help="The number of cells to pan the viewport down on each frame.", default=0)
+parser.add_argument("-n", "--max-nodes", type=int, help="The number of quadtree nodes to cache before evicting unused ones.", default=500_000)
+parser.add_argument("-br", "--brightness", type=int, help="The brightness of the display, 0 is darkest and 255 is brightest.", default=25)
+parser.add_argument("-s", "--speed", type=int, help="The time (ms) between frames.", default=100)
+parser.add_argument("-rgb", type=int, help="The r, g, and b value of the living cells.", nargs=3, default=[0,255,0])
+add_pipeline_arguments(parser)
+args = parser.parse_args()
+
+strip = create_strip(brightness=args.brightness)
+
+if __name__ == "__main__":
+    demo = HashLifeDemo(args.pattern, jump=args.jump, x=args.x, y=args.y, dx=args.dx, dy=args.dy,
+                        color=args.rgb, wait_ms=args.speed, max_nodes=args.max_nodes)
+    run_pipeline(demo.frames(), strip, args)
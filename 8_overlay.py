@@ -0,0 +1,42 @@
+import argparse
+from led_matrix import create_strip
+from life import simulate
+from frame_pipeline import add_pipeline_arguments, run_pipeline
+from compositor import Compositor, ImageLayer, FrameSourceLayer, TextScrollLayer, ClockLayer
+
+parser = argparse.ArgumentParser(
+    prog="Overlay",
+    description="Stack an image, Conway's Game of Life, a clock and a scrolling message on the 32x8 pixel matrix",
+)
+parser.add_argument("-img", "--image_path", type=str, help="The image to use as the background layer.", default=None)
+parser.add_argument("-l", "--life", action="store_true", help="Run the Game of Life (from random seeds) as a background layer.")
+parser.add_argument("-c", "--clock", action="store_true", help="Show the time over the background.")
+parser.add_argument("-m", "--message", type=str, help="A message to scroll across the top.", default=None)
+parser.add_argument("-mode", type=str, choices=["alpha", "add", "max"], help="How the message is blended onto the layers below it.", default="alpha")
+parser.add_argument("-rgb", type=int, help="The r, g, and b value of the clock and message.", nargs=3, default=[255,255,255])
+parser.add_argument("-f", "--fps", type=int, help="The number of frames per second to composite.", default=50)
+parser.add_argument("-g", "--generation-frames", type=int, help="The number of frames each Game of Life generation is shown for.", default=5)
+parser.add_argument("-sf", "--scroll-frames", type=int, help="The number of frames between each step of the message.", default=3)
+parser.add_argument("-br", "--brightness", type=int, help="The brightness of the display, 0 is darkest and 255 is brightest.", default=25)
+add_pipeline_arguments(parser)
+# Most frames only move one layer or none, so only write what changed
+parser.set_defaults(diff=True)
+args = parser.parse_args()
+
+strip = create_strip(brightness=args.brightness)
+
+if __name__ == "__main__":
+    # Layers are listed bottom first
+    compositor = Compositor()
+    if args.image_path:
+        compositor.add(ImageLayer(args.image_path))
+    if args.life:
+        compositor.add(FrameSourceLayer(simulate("random"), every=args.generation_frames, opacity=0.5))
+    if args.clock:
+        compositor.add(ClockLayer(color=args.rgb, x_offset=1))
+    if args.message:
+        compositor.add(TextScrollLayer(args.message, color=args.rgb, every=args.scroll_frames, mode=args.mode))
+
+    # Unchanged layers aren't blended again, and frames where nothing
+    # changed aren't written to the strip either
+    run_pipeline(compositor.frames(1_000 / args.fps), strip, args)
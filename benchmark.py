@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import argparse
+import numpy as np
+from headless import DEMOS, ROOT, run_demo, run_json_subprocess
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines.json")
+
+# For each metric, whether a bigger number is better
+METRICS = {
+    "fps": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "startup_ms": False,
+    "peak_rss_mb": False,
+}
+# The p99 latency is reported, but is too noisy run to run to flag
+REGRESSION_METRICS = [metric for metric in METRICS if metric != "latency_p99_ms"]
+# How many median absolute deviations (across the repeats) a metric
+# has to move by before the change can be told apart from noise
+NOISE_MADS = 3
+
+parser = argparse.ArgumentParser(
+    prog="Benchmark",
+    description="Run every demo headless for a fixed number of frames and compare the results against stored baselines",
+)
+parser.add_argument("demos", nargs="*", help="The demos to benchmark (defaults to all of them).", default=list(DEMOS))
+parser.add_argument("-f", "--frames", type=int, help="The number of frames to time each demo for.", default=300)
+parser.add_argument("-wu", "--warmup", type=int, help="The number of frames to run before timing.", default=20)
+parser.add_argument("-r", "--repeats", type=int, help="The number of runs of each demo; the median of each metric is kept.", default=3)
+parser.add_argument("-t", "--threshold", type=float, help="The relative change (0.2 = 20%%) past which a metric counts as a regression.", default=0.2)
+parser.add_argument("-b", "--baseline", type=str, help="The JSON file the baselines are stored in.", default=BASELINE_PATH)
+parser.add_argument("--save", action="store_true", help="Store these results as the new baselines.")
+parser.add_argument("--check", action="store_true", help="Exit with an error if any metric regressed past the threshold, or a demo failed or had no baseline to compare with.")
+parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+parser.add_argument("--launched", type=float, help=argparse.SUPPRESS)
+
+
+# Time a single demo in this process. Every strip.show() is a frame;
+# the time between them is the per-frame latency.
+def benchmark_demo(name, frames, warmup, launched):
+    show_times = []
+    run_demo(name, frames=frames + warmup, on_frame=lambda strip: show_times.append(time.perf_counter()))
+    first_show = time.time() - (time.perf_counter() - show_times[0]) if show_times else time.time()
+
+    # Demos that stop by themselves (like a still image) are timed on
+    # every frame they showed
+    timed = show_times[warmup:] if len(show_times) > warmup + 1 else show_times
+    latencies = np.diff(timed) * 1_000 if len(timed) > 1 else np.zeros(1)
+    return {
+        "demo": name,
+        "frames": len(latencies),
+        "fps": float(1_000 / latencies.mean()) if latencies.mean() > 0 else 0.0,
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "latency_p99_ms": float(np.percentile(latencies, 99)),
+        # From launching the interpreter to the first frame on the strip
+        "startup_ms": (first_show - launched) * 1_000,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1_024,
+    }
+
+
+# Benchmark a demo `repeats` times, each in a fresh interpreter, and
+# keep the median of every metric
+def benchmark_in_subprocess(name, frames, warmup, repeats):
+    runs = []
+    for _ in range(repeats):
+        command = [sys.executable, __file__, name, "-f", str(frames), "-wu", str(warmup),
+                   "--child", "--launched", repr(time.time())]
+        result = run_json_subprocess(command)
+        if "error" in result:
+            return {"demo": name, **result}
+        runs.append(result)
+    # How far the runs strayed from each other, to tell regressions from noise
+    spread = {}
+    for metric in REGRESSION_METRICS:
+        costs = np.array([metric_cost(metric, r[metric]) for r in runs])
+        spread[metric] = float(np.median(np.abs(costs - np.median(costs))))
+    return {"demo": name, "frames": runs[0]["frames"], "run": {"frames": frames, "warmup": warmup},
+            **{m: float(np.median([r[m] for r in runs])) for m in METRICS}, "spread": spread}
+
+
+# A metric as a cost, where bigger is worse
+def metric_cost(metric, value):
+    if metric == "fps":
+        return 1_000 / value if value else float("inf")
+    return value
+
+
+# Get the metrics that got worse than the baseline by more than the
+# threshold and by more than the noise seen across the repeats of
+# either run, as (metric, baseline, result) tuples. Frame rates are
+# compared as the time each frame takes.
+def find_regressions(result, baseline, threshold):
+    regressions = []
+    for metric in REGRESSION_METRICS:
+        if metric not in baseline or baseline[metric] == 0:
+            continue
+        before, after = metric_cost(metric, baseline[metric]), metric_cost(metric, result[metric])
+        noise = NOISE_MADS * max(baseline.get("spread", {}).get(metric, 0), result.get("spread", {}).get(metric, 0))
+        if after - before > max(threshold * before, noise):
+            regressions.append((metric, baseline[metric], result[metric]))
+    return regressions
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(benchmark_demo(args.demos[0], args.frames, args.warmup, args.launched)))
+        sys.exit(0)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)["demos"]
+
+    print(f"{'demo':>20} {'fps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'startup ms':>10} {'RSS MB':>7}")
+    results = {}
+    regressed = []
+    failed = []
+    unchecked = []
+    for name in args.demos:
+        r = benchmark_in_subprocess(name, args.frames, args.warmup, args.repeats)
+        if "error" in r:
+            print(f"{name:>20} failed: {r['error']}")
+            failed.append(name)
+            continue
+        results[name] = r
+        print(f"{name:>20} {r['fps']:>9.1f} {r['latency_p50_ms']:>8.3f} {r['latency_p95_ms']:>8.3f} "
+              f"{r['latency_p99_ms']:>8.3f} {r['startup_ms']:>10.0f} {r['peak_rss_mb']:>7.1f}")
+        baseline = baselines.get(name, {})
+        if not baseline:
+            print(f"{'':>20} not compared: no baseline")
+            unchecked.append(name)
+            continue
+        # Runs of different lengths aren't comparable
+        if baseline.get("run") != r["run"]:
+            print(f"{'':>20} not compared: the baseline was run with {baseline.get('run', 'unknown settings')}, "
+                  f"save a new one for {r['run']}")
+            unchecked.append(name)
+            continue
+        for metric, before, after in find_regressions(r, baseline, args.threshold):
+            regressed.append(name)
+            print(f"{'':>20} regression: {metric} went from {before:.3f} to {after:.3f}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "machine": platform.node(),
+                "platform": platform.platform(),
+                "demos": {**baselines, **results},
+            }, f, indent=1)
+        print(f"Saved baselines to {args.baseline}")
+
+    if regressed:
+        print(f"Regressed past {args.threshold:.0%}: {', '.join(sorted(set(regressed)))}")
+    # A demo that can't run at all has regressed as far as it can
+    if failed:
+        print(f"Failed to run: {', '.join(failed)}")
+    # Passing a check that compared nothing would hide regressions
+    if unchecked:
+        print(f"Not checked against a baseline: {', '.join(unchecked)}")
+    if args.check and (regressed or failed or unchecked):
+        sys.exit(1)
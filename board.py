@@ -0,0 +1,49 @@
+import numpy as np
+from led_matrix import MATRIX_SIZE, board_to_frame
+
+
+# A board is a matrix of cells. Rather than one Python object per cell,
+# every cell attribute is its own NumPy array indexed [x][y], so whole
+# boards can be updated and colored without per-cell lookups.
+class Board():
+
+    def __init__(self, size=MATRIX_SIZE):
+        self.size = size
+        self.is_active = np.zeros(size, dtype=bool)
+        self.visited = np.zeros(size, dtype=bool)
+        self.is_goal = np.zeros(size, dtype=bool)
+        # The number of consecutive steps that each cell was active for
+        self.steps_alive = np.zeros(size, dtype=np.int32)
+        self.color = np.zeros((*size, 3), dtype=np.uint8)
+
+    def __repr__(self):
+        return "\n".join("".join(str(int(cell)) for cell in col) for col in self.is_active)
+
+    # Get the total number of active cells
+    def count(self):
+        return int(np.count_nonzero(self.is_active))
+
+    # Place a (width, height) boolean pattern with its corner at (x, y).
+    # With flip=True the pattern flips the cells it covers instead.
+    def stamp(self, pattern, x=0, y=0, flip=False):
+        pattern = np.asarray(pattern, dtype=bool)
+        region = self.is_active[x:x + pattern.shape[0], y:y + pattern.shape[1]]
+        if flip:
+            region ^= pattern
+        else:
+            region[:] = pattern
+
+    # Get the color of every cell, with inactive cells turned off
+    def get_colors(self):
+        return np.where(self.is_active[:, :, None], self.color, 0).astype(np.uint8)
+
+    # Get the colors of this matrix of cells as an (8, 32, 3) frame
+    def get_frame(self):
+        return board_to_frame(self.get_colors())
+
+    # Get the integer value that corresponds to this boardstate,
+    # reading the cells in order as the bits of a binary number
+    def get_state_int(self):
+        bits = self.is_active.ravel()
+        padding = -len(bits) % 8
+        return int.from_bytes(np.packbits(bits).tobytes(), "big") >> padding
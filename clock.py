@@ -0,0 +1,79 @@
+import time
+
+# Every demo waits through this module rather than calling time.sleep
+# directly, so the same code can run against the real clock on the Pi
+# or a virtual one that skips ahead instantly (see headless.py).
+
+
+class RealClock():
+
+    # Seconds on a monotonic clock, for measuring intervals
+    def now(self):
+        return time.perf_counter()
+
+    # Seconds since the epoch, for showing the time of day
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    # Wait up to `timeout` seconds for a threading.Event to be set
+    def wait(self, event, timeout):
+        return event.wait(timeout)
+
+
+# A clock that only moves when something sleeps on it. Sleeping jumps
+# straight to the time it would have woken up, so a 10 minute ticker
+# runs as fast as it can render while still seeing the right times.
+class VirtualClock():
+
+    def __init__(self, start=0.0, epoch=None):
+        self.current = start
+        self.epoch = time.time() if epoch is None else epoch
+
+    def now(self):
+        return self.current
+
+    def time(self):
+        return self.epoch + self.current
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.current += seconds
+
+    def wait(self, event, timeout):
+        if not event.is_set() and timeout is not None:
+            self.sleep(timeout)
+        return event.is_set()
+
+
+_clock = RealClock()
+
+
+def get_clock():
+    return _clock
+
+
+# Swap in another clock and return the one it replaced
+def set_clock(clock):
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def now():
+    return _clock.now()
+
+
+def wall_time():
+    return _clock.time()
+
+
+def sleep(seconds):
+    _clock.sleep(seconds)
+
+
+def wait(event, timeout):
+    return _clock.wait(event, timeout)
@@ -0,0 +1,226 @@
+import os
+import time
+import clock
+import numpy as np
+from PIL import Image, ImageFont, ImageDraw
+from led_matrix import FRAME_SHAPE
+
+FRAME_HEIGHT, FRAME_WIDTH = FRAME_SHAPE[:2]
+# The pixel font shipped next to this file
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PixelOperator8.ttf")
+
+
+# Blend a layer (rgb and alpha as floats in [0, 1]) onto what's below it
+def blend(below, rgb, alpha, mode="alpha", out=None):
+    if out is None:
+        out = np.empty_like(below)
+    if mode == "alpha":
+        np.subtract(rgb, below, out=out)
+        out *= alpha
+        out += below
+    elif mode == "add":
+        np.multiply(rgb, alpha, out=out)
+        out += below
+        np.minimum(out, 1, out=out)
+    elif mode == "max":
+        np.multiply(rgb, alpha, out=out)
+        np.maximum(out, below, out=out)
+    else:
+        raise ValueError(f"Unknown blend mode `{mode}`, use `alpha`, `add` or `max`.")
+    return out
+
+
+# Render text into an RGBA array `height` pixels tall, colored
+# `color` wherever the font draws and transparent everywhere else
+def render_text(text, color=(255, 255, 255), font_path=FONT_PATH, fontsize=8, height=FRAME_HEIGHT):
+    font = ImageFont.truetype(font_path, fontsize)
+    width = max(1, int(font.getbbox(text)[2]))
+    mask = Image.new("L", (width, height), 0)
+    ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[:, :, :3] = color
+    rgba[:, :, 3] = np.asarray(mask)
+    return rgba
+
+
+# Turn an RGB frame into RGBA, treating black pixels as transparent
+def frame_to_rgba(frame):
+    rgba = np.empty((*frame.shape[:2], 4), dtype=np.uint8)
+    rgba[:, :, :3] = frame
+    rgba[:, :, 3] = np.where(frame.any(axis=2), 255, 0)
+    return rgba
+
+
+# A layer is an (8, 32, 4) RGBA image blended onto the layers below it.
+# `update()` advances the layer one frame and returns whether its
+# pixels changed; `version` counts those changes so the compositor
+# knows which of its cached blends are stale.
+class Layer():
+
+    def __init__(self, mode="alpha", opacity=1.0):
+        self.mode = mode
+        self.opacity = opacity
+        self.rgba = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 4), dtype=np.uint8)
+        self.version = 0
+
+    def update(self):
+        return False
+
+    # Replace the layer's pixels (call after drawing into self.rgba too)
+    def set_rgba(self, rgba):
+        self.rgba[:] = rgba
+        self.version += 1
+
+
+# A still image, cropped (or padded) to the frame
+class ImageLayer(Layer):
+
+    def __init__(self, image, x_offset=0, y_offset=0, **kwargs):
+        super().__init__(**kwargs)
+        rgba = np.asarray(Image.open(image).convert("RGBA") if isinstance(image, str) else image)
+        rgba = rgba[:FRAME_HEIGHT, :FRAME_WIDTH]
+        canvas = np.zeros_like(self.rgba)
+        canvas[:rgba.shape[0], :rgba.shape[1]] = rgba
+        self.set_rgba(np.roll(canvas, (-y_offset, x_offset), axis=(0, 1)))
+
+
+# A line of text that stays put, like a clock. Changing the text
+# re-renders it; setting the same text again is free.
+class TextLayer(Layer):
+
+    def __init__(self, text="", color=(255, 255, 255), x_offset=0, **kwargs):
+        super().__init__(**kwargs)
+        self.color = color
+        self.x_offset = x_offset
+        self.text = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text == self.text:
+            return False
+        self.text = text
+        rendered = render_text(text, color=self.color)[:, :FRAME_WIDTH - self.x_offset]
+        self.rgba[:] = 0
+        self.rgba[:, self.x_offset:self.x_offset + rendered.shape[1]] = rendered
+        self.version += 1
+        return True
+
+
+# Shows the current time, re-rendered only when the minute changes
+class ClockLayer(TextLayer):
+
+    def __init__(self, time_format="%H:%M", **kwargs):
+        self.time_format = time_format
+        super().__init__(text=time.strftime(time_format, time.localtime(clock.wall_time())), **kwargs)
+
+    def update(self):
+        return self.set_text(time.strftime(self.time_format, time.localtime(clock.wall_time())))
+
+
+# A message that scrolls in from the right and out to the left, one
+# column every `every` frames, then starts over
+class TextScrollLayer(Layer):
+
+    def __init__(self, text, color=(255, 255, 255), every=1, **kwargs):
+        super().__init__(**kwargs)
+        rendered = render_text(text, color=color)
+        # Lay the message out with a blank screen on either side
+        self.message = np.zeros((FRAME_HEIGHT, rendered.shape[1] + 2 * FRAME_WIDTH, 4), dtype=np.uint8)
+        self.message[:, FRAME_WIDTH:FRAME_WIDTH + rendered.shape[1]] = rendered
+        self.every = every
+        self.num_updates = 0
+        self.position = 0
+
+    def update(self):
+        self.num_updates += 1
+        if self.num_updates % self.every:
+            return False
+        self.position = (self.position + 1) % (self.message.shape[1] - FRAME_WIDTH)
+        self.set_rgba(self.message[:, self.position:self.position + FRAME_WIDTH])
+        return True
+
+
+# Any source of (8, 32, 3) frames, such as a simulation generator.
+# A new frame is pulled every `every` frames; black is transparent.
+class FrameSourceLayer(Layer):
+
+    def __init__(self, frames, every=1, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = iter(frames)
+        self.every = every
+        self.num_updates = 0
+
+    def update(self):
+        self.num_updates += 1
+        if (self.num_updates - 1) % self.every:
+            return False
+        frame = next(self.frames)
+        # Simulations yield (frame, wait_ms) pairs
+        if isinstance(frame, tuple):
+            frame = frame[0]
+        self.set_rgba(frame_to_rgba(frame))
+        return True
+
+
+# Blends a stack of layers (bottom first) into one frame. Each layer's
+# pixels are converted to floats only when it changes, and the blend of
+# every layer with those below it is cached, so a frame only re-blends
+# from the lowest layer that changed upward, and a frame where nothing
+# changed needs no blending at all. Every frame is still yielded; the
+# pipeline's diff stage is what skips writing LEDs that didn't change.
+class Compositor():
+
+    def __init__(self, layers=()):
+        self.layers = []
+        self.layer_versions = []
+        self.layer_rgb = []
+        self.layer_alpha = []
+        self.blends = []
+        self.background = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.float32)
+        self.scaled = np.zeros_like(self.background)
+        self.frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+        self.dirty_from = 0
+        for layer in layers:
+            self.add(layer)
+
+    def add(self, layer):
+        self.layers.append(layer)
+        self.layer_versions.append(None)
+        self.layer_rgb.append(np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.float32))
+        self.layer_alpha.append(np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 1), dtype=np.float32))
+        self.blends.append(np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.float32))
+        self.dirty_from = min(self.dirty_from, len(self.layers) - 1)
+        return layer
+
+    # Advance every layer one frame
+    def update(self):
+        for layer in self.layers:
+            layer.update()
+
+    # Blend whatever changed and return the frame
+    def compose(self):
+        for i, layer in enumerate(self.layers):
+            if layer.version != self.layer_versions[i]:
+                self.layer_versions[i] = layer.version
+                np.multiply(layer.rgba[:, :, :3], 1 / 255, out=self.layer_rgb[i])
+                np.multiply(layer.rgba[:, :, 3:], layer.opacity / 255, out=self.layer_alpha[i])
+                self.dirty_from = min(self.dirty_from, i)
+
+        if self.dirty_from >= len(self.layers):
+            return self.frame
+
+        for i in range(self.dirty_from, len(self.layers)):
+            below = self.blends[i - 1] if i > 0 else self.background
+            blend(below, self.layer_rgb[i], self.layer_alpha[i], mode=self.layers[i].mode, out=self.blends[i])
+        self.dirty_from = len(self.layers)
+
+        np.multiply(self.blends[-1], 255, out=self.scaled)
+        np.rint(self.scaled, out=self.scaled)
+        self.frame[:] = self.scaled
+        return self.frame
+
+    # Advance the layers and yield the composited frame, forever
+    def frames(self, wait_ms):
+        while True:
+            self.update()
+            yield self.compose(), wait_ms
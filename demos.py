@@ -0,0 +1,246 @@
+import os
+import sys
+import numpy as np
+from PIL import Image
+from led_matrix import MATRIX_SIZE, FRAME_SHAPE, board_to_frame
+from compositor import render_text
+from hashlife import HashLife, Viewport
+from life import SEED_LIBRARY_PATH, load_seed_library, simulate
+from maze import solve_mazes
+from sparse_life import simulate_sparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NEURAL_NETWORK_DIR = os.path.join(ROOT, "neural_networks")
+
+
+# A demo does all of its slow setup (loading images, fonts, models and
+# seeds) when it is created, then `frames()` yields (frame, hold_ms)
+# pairs forever. `warm()` starts the generator and computes its first
+# frame ahead of time into `pending`, and `advance()` computes the next
+# one, so a demo always has a frame ready to be switched to.
+class Demo():
+    name = "demo"
+
+    def __init__(self):
+        self.pending = None
+        self._frames = None
+
+    def frames(self):
+        raise NotImplementedError
+
+    def warm(self):
+        if self._frames is None:
+            self._frames = self.frames()
+            self.pending = next(self._frames)
+
+    # Compute the frame after the pending one (once it has been shown)
+    def advance(self):
+        self.warm()
+        self.pending = next(self._frames)
+
+
+# Convert an RGBA image (a path or a PIL image) to an (8, 32, 3) frame,
+# leaving transparent pixels and anything past the image off. The
+# offsets shift the image right and up, wrapping around the edges.
+def image_to_frame(image, x_offset=0, y_offset=0):
+    if isinstance(image, str):
+        image = Image.open(image)
+    img_array = np.asarray(image.convert("RGBA"))[:FRAME_SHAPE[0], :FRAME_SHAPE[1]]
+    height, width = img_array.shape[:2]
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    frame[:height, :width] = np.where(img_array[:, :, 3:] > 0, img_array[:, :, :3], 0)
+    return np.roll(frame, (-y_offset, x_offset), axis=(0, 1))
+
+
+class ImageDemo(Demo):
+    name = "image"
+
+    def __init__(self, image=os.path.join(ROOT, "poker.png"), hold_ms=1_000):
+        super().__init__()
+        self.frame = image_to_frame(image)
+        self.hold_ms = hold_ms
+
+    def frames(self):
+        while True:
+            yield self.frame, self.hold_ms
+
+
+class BannerDemo(Demo):
+    name = "banner"
+
+    def __init__(self, image=os.path.join(ROOT, "poker.png"), wait_ms=150):
+        super().__init__()
+        self.banner = image_to_frame(image)
+        self.wait_ms = wait_ms
+
+    def frames(self):
+        frame = np.empty_like(self.banner)
+        columns = np.arange(self.banner.shape[1])
+        x_offset = 0
+        while True:
+            np.take(self.banner, (columns - x_offset) % self.banner.shape[1], axis=1, out=frame)
+            yield frame, self.wait_ms
+            x_offset -= 1
+
+
+class MessageDemo(Demo):
+    name = "message"
+
+    def __init__(self, messages=("DIMMiN says hello!",), color=(255, 255, 255), wait_ms=20):
+        super().__init__()
+        width = FRAME_SHAPE[1]
+        # Render every message once, laid out with a blank screen on
+        # either side so it scrolls fully in and out
+        self.messages = []
+        for text in messages:
+            rgba = render_text(text, color=color)
+            message = np.zeros((FRAME_SHAPE[0], rgba.shape[1] + 2 * width, 3), dtype=np.uint8)
+            message[:, width:width + rgba.shape[1]] = np.where(rgba[:, :, 3:] > 0, rgba[:, :, :3], 0)
+            self.messages.append(message)
+        self.wait_ms = wait_ms
+
+    # Scroll one message across, as views of its laid out strip
+    def message_frames(self, message):
+        width = FRAME_SHAPE[1]
+        for position in range(1, message.shape[1] - width + 1):
+            yield message[:, position:position + width], self.wait_ms
+
+    def frames(self):
+        while True:
+            for message in self.messages:
+                yield from self.message_frames(message)
+
+
+class LifeDemo(Demo):
+    name = "life"
+
+    def __init__(self, style="library", seed_library_path=SEED_LIBRARY_PATH, color=None, wait_ms=100):
+        super().__init__()
+        self.color = color
+        self.wait_ms = wait_ms
+        self.seed_library = None
+        if style == "library":
+            try:
+                self.seed_library = load_seed_library(seed_library_path)
+            except FileNotFoundError:
+                print(f"No seed library at {seed_library_path}, using random seeds")
+                style = "random"
+        self.style = style
+
+    # In one color, only the cells that were born or died are redrawn
+    def frames(self):
+        if self.color is not None:
+            return simulate_sparse(self.style, seed_library=self.seed_library, color=self.color, wait_ms=self.wait_ms)
+        return simulate(self.style, seed_library=self.seed_library, wait_ms=self.wait_ms)
+
+
+class MazeDemo(Demo):
+    name = "maze"
+
+    def __init__(self, wait_ms=10):
+        super().__init__()
+        self.wait_ms = wait_ms
+
+    # The next maze is generated while the last frame of the previous
+    # search is being held
+    def frames(self):
+        return solve_mazes(wait_ms=self.wait_ms)
+
+
+class HashLifeDemo(Demo):
+    name = "hashlife"
+
+    def __init__(self, pattern=os.path.join(ROOT, "patterns", "gosper_glider_gun.rle"), jump=0, x=0, y=0, dx=0, dy=0, color=(0, 255, 0), wait_ms=100, max_nodes=500_000):
+        super().__init__()
+        self.life = HashLife.from_file(pattern, max_nodes=max_nodes)
+        self.viewport = Viewport(self.life, size=MATRIX_SIZE)
+        self.viewport.center_on_pattern()
+        self.viewport.pan(x, y)
+        self.jump, self.dx, self.dy = jump, dx, dy
+        self.color = color
+        self.wait_ms = wait_ms
+
+    def frames(self):
+        while True:
+            yield self.viewport.get_frame(color=self.color), self.wait_ms
+            self.life.step_power(self.jump)
+            self.viewport.pan(self.dx, self.dy)
+
+
+# Color each neuron by its value, from red (smallest) to green
+# (largest), leaving neurons at exactly 0 off
+def map_neuron_colors(values):
+    span = values.max() - values.min()
+    hue = 0.33 * (values - values.min()) / (span if span else 1)
+    # HSV to RGB with full saturation and value, for hues below 1/3
+    sector = hue * 6
+    rising = np.clip(sector, 0, 1)
+    falling = np.clip(2 - sector, 0, 1)
+    colors = np.stack([falling, rising, np.zeros_like(hue)], axis=-1)
+    colors = (colors * 255).astype(np.uint8)
+    colors[values == 0] = 0
+    return colors
+
+
+# Lay out a network's layer outputs (from forward_details on a single
+# sample) as one column of the matrix per layer, centered
+def network_frame(layer_outputs):
+    size = MATRIX_SIZE
+    state = np.zeros(size, dtype=np.float32)
+    for y, layer in enumerate(layer_outputs[:-1]):
+        layer_data = layer[0][:size[0]].numpy()
+        start_idx = (size[0] - len(layer_data)) // 2
+        state[start_idx:start_idx + len(layer_data), y] = layer_data
+    final_output = layer_outputs[-1][0].numpy()
+    start_idx = (size[0] - len(final_output)) // 2
+    state[start_idx:start_idx + len(final_output), -1] = final_output
+    # The network has always been drawn mirrored left to right
+    # compared to the other boards
+    return board_to_frame(map_neuron_colors(state)[::-1])
+
+
+class NeuralNetworkDemo(Demo):
+    name = "neural_network"
+
+    def __init__(self, network=0, quantize=False, wait_ms=1_000, directory=NEURAL_NETWORK_DIR):
+        super().__init__()
+        import torch
+        import torchvision.datasets as datasets
+        import __main__
+        if NEURAL_NETWORK_DIR not in sys.path:
+            sys.path.insert(0, NEURAL_NETWORK_DIR)
+        from network import Network, quantize_network
+        # The models were pickled by a script that imported Network
+        # into __main__, which is where torch.load looks for it
+        if not hasattr(__main__, "Network"):
+            __main__.Network = Network
+
+        self.torch = torch
+        self.model = torch.load(os.path.join(directory, "models", f"network_{network}.pth"), weights_only=False)
+        if quantize:
+            self.model = quantize_network(self.model)
+        # Normalized the same as transforms.Normalize((0.5,), (0.5,))
+        mnist_testset = datasets.MNIST(root=os.path.join(directory, "data"), train=False, download=True)
+        self.images = (mnist_testset.data.float() / 255 - 0.5) / 0.5
+        self.labels = mnist_testset.targets
+        # The test sample shown in the latest frame
+        self.sample_index = None
+        self.wait_ms = wait_ms
+
+    def get_frame(self):
+        return network_frame(self.model.layer_outputs)
+
+    def frames(self):
+        with self.torch.no_grad():
+            while True:
+                for i in self.torch.randperm(len(self.images)).tolist():
+                    self.sample_index = i
+                    self.model.forward_details(self.images[i])
+                    yield self.get_frame(), self.wait_ms
+
+    # The label of the latest sample, and the digit the network predicted
+    def get_prediction(self):
+        return int(self.labels[self.sample_index]), int(self.model.layer_outputs[-1][0].argmax())
+
+
+DEMO_TYPES = {demo.name: demo for demo in (ImageDemo, BannerDemo, MessageDemo, LifeDemo, MazeDemo, HashLifeDemo, NeuralNetworkDemo)}
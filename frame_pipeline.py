@@ -0,0 +1,182 @@
+import argparse
+import math
+import numpy as np
+import clock
+from collections import deque
+from led_matrix import LED_COUNT, MAX_REFRESH_HZ, pack_frame, show_changes
+from frame_queue import FramePrefetcher
+
+# Every demo is a lazy source of (frame, hold_ms) pairs: an (8, 32, 3)
+# frame and how long it stays on the display. Stages are generators
+# that take such a source and yield a new one, so they can be stacked
+# in any combination, and play() is the one sink that talks to a strip:
+#
+#   play(diff(to_wire(throttle(frames, 60))), strip)
+#
+# Along the way a frame may become the packed colors of each LED in
+# wire order (to_wire), or just the LEDs that changed (diff).
+
+ALL_LEDS = np.arange(LED_COUNT)
+
+
+# Compute the source in a background worker, up to `maxsize` frames
+# ahead. Frames are copied, since sources may reuse one buffer.
+def prefetch(frames, maxsize=32, use_process=True):
+    with FramePrefetcher(lambda: ((np.array(frame), hold_ms) for frame, hold_ms in frames),
+                         maxsize=maxsize, use_process=use_process) as prefetcher:
+        yield from prefetcher
+
+
+# Show at most `max_fps` frames a second. Frames held for less than a
+# refresh are coalesced: the newest one is shown, for all of their time.
+# Each frame counts for at least the time it takes to write, which it
+# would take up on the strip even with no hold.
+def throttle(frames, max_fps=MAX_REFRESH_HZ):
+    min_hold_ms = 1_000 / max_fps
+    write_ms = 1_000 / MAX_REFRESH_HZ
+    held_ms = 0
+    for frame, hold_ms in frames:
+        held_ms += max(hold_ms, write_ms)
+        if held_ms >= min_hold_ms:
+            yield frame, held_ms
+            held_ms = 0
+
+
+# Pass every frame on unchanged, calling `record(frame, hold_ms)` first
+def tee(frames, record):
+    for frame, hold_ms in frames:
+        record(frame, hold_ms)
+        yield frame, hold_ms
+
+
+# Map frames to the packed color of every LED, in wire order. The same
+# buffer is reused, so later stages must use it before the next frame.
+def to_wire(frames):
+    packed = np.empty(LED_COUNT, dtype=np.uint32)
+    for frame, hold_ms in frames:
+        yield pack_frame(frame, out=packed), hold_ms
+
+
+# Turn packed frames into (leds, colors) updates of only the LEDs that
+# changed since the last frame, so unchanged frames cost no writes
+def diff(frames):
+    previous = None
+    for packed, hold_ms in frames:
+        if previous is None:
+            changed = ALL_LEDS
+            previous = packed.copy()
+        else:
+            changed = np.flatnonzero(packed != previous)
+            previous[changed] = packed[changed]
+        yield (changed, packed[changed]), hold_ms
+
+
+# Write anything a stage can yield to the strip and display it. Updates
+# that change nothing leave the strip alone.
+def write(strip, frame):
+    if isinstance(frame, tuple):
+        leds, colors = frame
+    elif frame.ndim == 1:
+        leds, colors = ALL_LEDS, frame
+    else:
+        leds, colors = ALL_LEDS, pack_frame(frame)
+    if len(leds):
+        show_changes(strip, leds, colors)
+
+
+# The sink: show every frame and hold it for its time (less however
+# long it took to write), until the source runs out. Setting `wake`
+# cuts the current hold short, like the playlist does to switch demos.
+def play(frames, strip, wake=None):
+    try:
+        for frame, hold_ms in frames:
+            shown = clock.now()
+            write(strip, frame)
+            remaining = hold_ms / 1_000 - (clock.now() - shown)
+            if wake is None:
+                clock.sleep(remaining)
+            elif remaining > 0:
+                clock.wait(wake, remaining)
+    finally:
+        # Stops any prefetch workers down the line
+        if hasattr(frames, "close"):
+            frames.close()
+
+
+# Records the frames that go by to be saved as an animation, like
+# preview.py makes. The strip is sampled `fps` times a second as the
+# frames arrive (repeats are merged), and only the last `max_seconds`
+# are kept, so demos that never end don't grow it without bound.
+class Recorder():
+
+    def __init__(self, fps=50, max_seconds=300):
+        self.sample_ms = 1_000 / fps
+        self.max_samples = int(max_seconds * fps)
+        # [frame, number of samples] pairs, oldest first
+        self.recorded = deque()
+        self.num_samples = 0
+        self.shown_ms = 0
+
+    def __call__(self, frame, hold_ms):
+        # Writing each frame to the strip takes time as well
+        start_ms = self.shown_ms
+        self.shown_ms += max(hold_ms, 1_000 / MAX_REFRESH_HZ)
+        # The samples taken while this frame is on the strip
+        samples = math.ceil(self.shown_ms / self.sample_ms) - math.ceil(start_ms / self.sample_ms)
+        if not samples:
+            return
+        if self.recorded and np.array_equal(self.recorded[-1][0], frame):
+            self.recorded[-1][1] += samples
+        else:
+            self.recorded.append([np.array(frame), samples])
+        self.num_samples += samples
+
+        while self.num_samples > self.max_samples:
+            excess = self.num_samples - self.max_samples
+            if self.recorded[0][1] <= excess:
+                self.num_samples -= self.recorded.popleft()[1]
+            else:
+                self.recorded[0][1] -= excess
+                self.num_samples -= excess
+
+    def save(self, path, scale=10):
+        from preview import save_preview
+        if self.recorded:
+            save_preview([(frame, samples * self.sample_ms) for frame, samples in self.recorded], path, scale=scale)
+
+
+# An argparse type for rates, which have to be above 0
+def positive_float(value):
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, got {value}")
+    return rate
+
+
+# The stages every demo script can switch on from the command line
+def add_pipeline_arguments(parser):
+    parser.add_argument("--max-fps", type=float, help="Coalesce frames so at most this many are shown a second.", default=None)
+    parser.add_argument("--diff", action="store_true", help="Only rewrite the LEDs that changed since the last frame.")
+    parser.add_argument("--record", type=str, help="Also save what was shown to this .gif or .png once the demo ends.", default=None)
+    parser.add_argument("--record-seconds", type=float, help="Keep only the last this many seconds of the recording.", default=300)
+
+
+# Run a source through the stages chosen in `args` (from a parser with
+# add_pipeline_arguments) and play it on the strip. Prefetching is up
+# to each script, as only the simulations need it.
+def run_pipeline(frames, strip, args, prefetch_frames=0, use_process=True, wake=None):
+    if prefetch_frames:
+        frames = prefetch(frames, maxsize=prefetch_frames, use_process=use_process)
+    if args.max_fps:
+        frames = throttle(frames, args.max_fps)
+    recorder = Recorder(max_seconds=args.record_seconds) if args.record else None
+    if recorder:
+        frames = tee(frames, recorder)
+    frames = to_wire(frames)
+    if args.diff:
+        frames = diff(frames)
+    try:
+        play(frames, strip, wake=wake)
+    finally:
+        if recorder:
+            recorder.save(args.record)
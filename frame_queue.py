@@ -0,0 +1,247 @@
+import os
+import time
+import clock
+import queue
+import threading
+import traceback
+import multiprocessing as mp
+import numpy as np
+from led_matrix import FRAME_SHAPE, MAX_REFRESH_HZ
+from framebuffer import SharedFrameBuffer
+
+# Marks the end of the frames coming out of a worker
+_DONE = "done"
+
+
+# The traceback of an exception raised in a worker, attached as the
+# cause of the exception when it's raised again in the display loop
+class WorkerTraceback(Exception):
+
+    def __str__(self):
+        return f"\n\nRaised in the worker:\n{self.args[0]}"
+
+
+# Carries an exception out of a worker. Tracebacks aren't pickled, so
+# its text goes along with it.
+class _Failed():
+
+    def __init__(self, error):
+        self.error = error
+        self.traceback = "".join(traceback.format_exception(error))
+
+    def reraise(self):
+        raise self.error from WorkerTraceback(self.traceback)
+
+
+# Run a frame generator in a background worker and hand the frames
+# to the display loop through a bounded queue. The worker computes
+# ahead (next generations, the next maze, reseeds...) while the main
+# loop only presents, and blocks once `maxsize` frames are waiting.
+#
+# `make_frames` is called inside the worker and must return an
+# iterable. With use_process=True it runs in a forked process so it
+# gets a core of its own, and each frame must be picklable. Exceptions
+# raised by the frames are raised again when iterating.
+class FramePrefetcher():
+
+    def __init__(self, make_frames, maxsize=32, use_process=True):
+        self.make_frames = make_frames
+        self.use_process = use_process
+        self.parent_pid = os.getpid()
+        if use_process:
+            ctx = mp.get_context("fork")
+            self.queue = ctx.Queue(maxsize)
+            self.stop_event = ctx.Event()
+            self.worker = ctx.Process(target=self._work, daemon=True)
+        else:
+            self.queue = queue.Queue(maxsize)
+            self.stop_event = threading.Event()
+            self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def _work(self):
+        try:
+            for frame in self.make_frames():
+                if not self._put(frame):
+                    break
+            else:
+                self._put(_DONE)
+        except Exception as error:
+            self._put(_Failed(error))
+        if self.use_process and self._stopping():
+            # Nobody will read what's left in the queue, so don't wait
+            # to flush it on exit
+            self.queue.cancel_join_thread()
+
+    # Put an item on the queue, giving up if the worker is stopping.
+    # Keeps checking in so a full queue can't hang close(), or the
+    # worker once its display process is gone.
+    def _put(self, item):
+        while not self._stopping():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    # Whether the worker should stop, including when the process that
+    # started it died without closing the prefetcher
+    def _stopping(self):
+        return self.stop_event.is_set() or (self.use_process and os.getppid() != self.parent_pid)
+
+    def __iter__(self):
+        while True:
+            frame = self.queue.get()
+            if isinstance(frame, _Failed):
+                frame.reraise()
+            if isinstance(frame, str) and frame == _DONE:
+                return
+            yield frame
+
+    # Stop the worker and wait for it to exit
+    def close(self):
+        self.stop_event.set()
+        while self.worker.is_alive():
+            try:
+                self.queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self.worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Run a simulation at full speed in a background worker while the
+# display samples only its newest frame, for when the simulation can
+# step much faster than the strip refreshes. Every step is published to
+# a private SharedFrameBuffer (the worker doesn't wait on the display
+# for steps), and `frames()` yields the latest one at up to `fps`, so many steps
+# are coalesced into each frame that is shown.
+#
+# `make_frames` is called inside the worker and may yield frames or
+# (frame, hold_ms) pairs. Sources yield their steps with no hold, so a
+# hold marks a frame that has to be seen, like a new maze or a new
+# seed: the worker waits for the display to show it, then holds it.
+# `max_steps_per_second` caps how fast the simulation steps. Exceptions
+# raised by the simulation are raised again by `frames()`.
+class LatestFrameSampler():
+
+    def __init__(self, make_frames, shape=FRAME_SHAPE, use_process=True, max_steps_per_second=None):
+        self.make_frames = make_frames
+        self.max_steps_per_second = max_steps_per_second
+        self.fb = SharedFrameBuffer(shape=shape, create=True)
+        # The sequence number of the last frame the display showed
+        self.shown_sequence = mp.get_context("fork").Value("q", 0, lock=False)
+        self.num_frames = 0
+        self.started = clock.now()
+        self.use_process = use_process
+        self.parent_pid = os.getpid()
+        if use_process:
+            ctx = mp.get_context("fork")
+            self.stop_event = ctx.Event()
+            self.done_event = ctx.Event()
+            self.errors = ctx.SimpleQueue()
+            self.worker = ctx.Process(target=self._work, daemon=True)
+        else:
+            self.stop_event = threading.Event()
+            self.done_event = threading.Event()
+            self.errors = queue.SimpleQueue()
+            self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def _work(self):
+        frames = self.make_frames()
+        step_time = 1 / self.max_steps_per_second if self.max_steps_per_second else 0
+        next_step = clock.now()
+        try:
+            for frame in frames:
+                hold_ms = 0
+                if isinstance(frame, tuple):
+                    frame, hold_ms = frame
+                self.fb.publish(frame)
+                if hold_ms:
+                    self._wait_until_shown(self.fb.sequence)
+                    clock.sleep(hold_ms / 1_000)
+                if self._stopping():
+                    return
+                if step_time:
+                    next_step = max(next_step + step_time, clock.now() - step_time)
+                    clock.sleep(next_step - clock.now())
+        except Exception as error:
+            self.errors.put(_Failed(error))
+        finally:
+            # Lets the source clean up (like saving a checkpoint) when stopped
+            if hasattr(frames, "close"):
+                frames.close()
+            self.done_event.set()
+
+    # Wait until the display has shown frame `sequence` (or is stopping).
+    # This waits on another process, not the demo's clock, so it polls in
+    # real time even on a virtual clock.
+    def _wait_until_shown(self, sequence):
+        while self.shown_sequence.value < sequence and not self._stopping():
+            time.sleep(0.001)
+
+    # Whether the worker should stop, including when the process that
+    # started it died without closing the sampler
+    def _stopping(self):
+        return self.stop_event.is_set() or (self.use_process and os.getppid() != self.parent_pid)
+
+    # The number of steps the simulation has taken
+    @property
+    def num_steps(self):
+        return self.fb.sequence
+
+    # Steps and frames shown per second since the sampler started
+    def rates(self):
+        elapsed = max(clock.now() - self.started, 1e-9)
+        return self.num_steps / elapsed, self.num_frames / elapsed
+
+    # Yield the newest frame up to `fps` times a second, skipping
+    # samples where the simulation hasn't stepped since the last one.
+    # Ends after the last frame once the simulation finishes, raising
+    # what the simulation raised if it failed.
+    def frames(self, fps=MAX_REFRESH_HZ, report_every=None):
+        frame_time = 1 / min(fps, MAX_REFRESH_HZ)
+        frame = np.empty(self.fb.shape, dtype=np.uint8)
+        last_sequence = 0
+        next_time = clock.now()
+        next_report = next_time + (report_every or 0)
+        while True:
+            # Checked before reading so the final frame is never missed
+            finished = self.done_event.is_set()
+            sequence, frame = self.fb.read(frame)
+            if sequence != last_sequence:
+                last_sequence = sequence
+                self.num_frames += 1
+                yield frame
+                self.shown_sequence.value = sequence
+            elif finished:
+                if not self.errors.empty():
+                    self.errors.get().reraise()
+                return
+
+            if report_every and clock.now() >= next_report:
+                steps_per_second, frames_per_second = self.rates()
+                print(f"{steps_per_second:,.0f} steps/s, {frames_per_second:.1f} frames/s "
+                      f"({steps_per_second / max(frames_per_second, 1e-9):.1f} steps per frame)")
+                next_report += report_every
+            next_time += frame_time
+            clock.sleep(next_time - clock.now())
+
+    # Stop the worker and free the shared buffer
+    def close(self):
+        self.stop_event.set()
+        self.worker.join()
+        self.fb.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,140 @@
+import os
+import clock
+import fcntl
+import tempfile
+import argparse
+import contextlib
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from led_matrix import FRAME_SHAPE, LED_BRIGHTNESS, MAX_REFRESH_HZ, create_strip, show_frame
+
+# The first 64 bytes of the shared block hold the header:
+# [sequence number, index of the front buffer]
+HEADER_BYTES = 64
+SEQUENCE, FRONT = 0, 1
+
+
+# A double-buffered frame buffer living in shared memory. Producers in
+# any process draw into the back buffer through a NumPy view and then
+# swap it to the front, while a single driver process copies the front
+# buffer out to the strip. Nothing is pickled or sent through a pipe.
+class SharedFrameBuffer():
+
+    def __init__(self, name=None, shape=FRAME_SHAPE, create=False):
+        self.shape = tuple(shape)
+        frame_bytes = int(np.prod(self.shape))
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_BYTES + 2 * frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the block with this process's resource
+            # tracker, which would unlink it when this producer exits and
+            # take it away from the driver and every other producer
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.name = self.shm.name
+        self.owner = create
+
+        self.header = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        self.buffers = np.ndarray((2, *self.shape), dtype=np.uint8, buffer=self.shm.buf, offset=HEADER_BYTES)
+        if create:
+            self.header[:] = 0
+            self.buffers[:] = 0
+
+        # Producers may live in unrelated processes, so swaps are
+        # serialized with a file lock named after the shared block
+        lock_path = os.path.join(tempfile.gettempdir(), f"{self.name.lstrip('/')}.lock")
+        self.lock_file = open(lock_path, "a+")
+
+    @classmethod
+    def attach(cls, name, shape=FRAME_SHAPE):
+        return cls(name=name, shape=shape, create=False)
+
+    # The number of frames published so far
+    @property
+    def sequence(self):
+        return int(self.header[SEQUENCE])
+
+    # Draw into the back buffer and publish it once the block exits:
+    #   with fb.writing() as frame:
+    #       frame[:] = ...
+    @contextlib.contextmanager
+    def writing(self):
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            back = 1 - int(self.header[FRONT])
+            yield self.buffers[back]
+            self.header[FRONT] = back
+            self.header[SEQUENCE] += 1
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    # Copy a finished frame into the back buffer and publish it
+    def publish(self, frame):
+        with self.writing() as back:
+            back[:] = frame
+
+    # Copy the newest frame into `out` and return its sequence number.
+    # If a producer swapped buffers while we were copying the copy is
+    # retried, so the frame is never half old and half new.
+    def read(self, out=None):
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        while True:
+            sequence = int(self.header[SEQUENCE])
+            out[:] = self.buffers[int(self.header[FRONT])]
+            if int(self.header[SEQUENCE]) == sequence:
+                return sequence, out
+
+    def close(self):
+        # Drop our views before closing the block they point into
+        del self.header, self.buffers
+        self.lock_file.close()
+        self.shm.close()
+        if self.owner:
+            with contextlib.suppress(FileNotFoundError):
+                self.shm.unlink()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.lock_file.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Push the newest frame from the shared buffer to the strip at a
+# steady rate. The strip is only rewritten when a new frame arrives.
+def run_driver(fb, strip, fps=60, max_frames=None):
+    frame_time = 1 / min(fps, MAX_REFRESH_HZ)
+    frame = np.empty(fb.shape, dtype=np.uint8)
+    last_sequence = -1
+    num_frames = 0
+    next_time = clock.now()
+    while max_frames is None or num_frames < max_frames:
+        sequence, frame = fb.read(frame)
+        if sequence != last_sequence:
+            show_frame(strip, frame)
+            last_sequence = sequence
+            num_frames += 1
+        next_time += frame_time
+        clock.sleep(next_time - clock.now())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="FrameBufferDriver",
+        description="Own the LED strip and display frames that other processes write into shared memory",
+    )
+    parser.add_argument("-n", "--name", type=str, help="The name of the shared memory block producers attach to.", default="pixels")
+    parser.add_argument("-br", "--brightness", type=int, help="The brightness of the display, 0 is darkest and 255 is brightest.", default=LED_BRIGHTNESS)
+    parser.add_argument("-f", "--fps", type=int, help="The refresh rate of the strip.", default=60)
+    args = parser.parse_args()
+
+    strip = create_strip(brightness=args.brightness)
+    with SharedFrameBuffer(name=args.name, create=True) as fb:
+        print(f"Driving frames from shared memory '{fb.name}'...")
+        try:
+            run_driver(fb, strip, fps=args.fps)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,123 @@
+import time
+import argparse
+import functools
+import numpy as np
+from led_matrix import MATRIX_SIZE
+
+# The (dx, dy) offsets of each neighborhood. Von Neumann neighbors are
+# in the order the maze solver has always pushed them onto its stack.
+MOORE = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+VON_NEUMANN = ((-1, 0), (0, -1), (0, 1), (1, 0))
+# The cells two steps away in each direction, which the maze carver
+# jumps between
+CARVE_JUMPS = ((2, 0), (-2, 0), (0, 2), (0, -2))
+
+NEIGHBORHOODS = {"moore": MOORE, "von_neumann": VON_NEUMANN, "carve": CARVE_JUMPS}
+
+
+# The neighbors of every cell of a (width, height) grid, worked out once
+# as flat cell indices (x * height + y, the order of a raveled Board
+# array) so that neighbor queries become array gathers instead of
+# building and bounds checking coordinates on every call.
+#
+# `neighbors` is (cells, k): the k-th neighbor of each cell, or the
+# index `cells` (one past the last cell) where it would be off a
+# bounded grid. Gathering from a flat array with one extra zero at the
+# end therefore counts cells past the edges as empty. `neighbor_lists`
+# holds only the neighbors that exist, for code stepping cell by cell.
+class GridTopology():
+
+    def __init__(self, size=MATRIX_SIZE, offsets=MOORE, wrap=False):
+        self.size = tuple(size)
+        self.offsets = tuple(offsets)
+        self.wrap = wrap
+        width, height = self.size
+        self.num_cells = width * height
+
+        x, y = np.divmod(np.arange(self.num_cells), height)
+        self.neighbors = np.empty((self.num_cells, len(self.offsets)), dtype=np.intp)
+        for k, (dx, dy) in enumerate(self.offsets):
+            nx, ny = x + dx, y + dy
+            if wrap:
+                self.neighbors[:, k] = (nx % width) * height + ny % height
+            else:
+                on_grid = (0 <= nx) & (nx < width) & (0 <= ny) & (ny < height)
+                self.neighbors[:, k] = np.where(on_grid, nx * height + ny, self.num_cells)
+        self.neighbor_lists = [tuple(j for j in row if j < self.num_cells) for row in self.neighbors.tolist()]
+
+    def index(self, x, y):
+        return x * self.size[1] + y
+
+    def position(self, i):
+        return divmod(i, self.size[1])
+
+    # Count the neighbors of every cell that are set in a (width, height)
+    # boolean array
+    def count(self, values):
+        flat = np.zeros(self.num_cells + 1, dtype=np.uint8)
+        flat[:-1] = values.ravel()
+        return flat[self.neighbors].sum(axis=1, dtype=np.uint8).reshape(self.size)
+
+
+# Topologies are immutable, so every board of the same geometry shares one
+@functools.lru_cache(maxsize=None)
+def get_topology(size=MATRIX_SIZE, neighborhood="moore", wrap=False):
+    return GridTopology(size, NEIGHBORHOODS[neighborhood], wrap=wrap)
+
+
+# Time the average call (us) of `query` over `repeats`
+def time_query(query, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - start) / repeats * 1_000_000
+
+
+if __name__ == "__main__":
+    from maze import MazeBoard
+
+    parser = argparse.ArgumentParser(
+        prog="GridTopologyBenchmark",
+        description="Compare neighbor queries through the precomputed topology against building them on every call",
+    )
+    parser.add_argument("-r", "--repeats", type=int, help="The number of times to run each query.", default=2_000)
+    args = parser.parse_args()
+
+    size = MATRIX_SIZE
+    board = np.random.rand(*size) < 0.3
+    moore = get_topology(size, "moore")
+    von_neumann = get_topology(size, "von_neumann")
+
+    # How the neighbors were found before, kept here to compare against
+    def pad_and_slice_count(values, offsets):
+        width, height = values.shape
+        padded = np.pad(values.astype(np.uint8), 1)
+        counts = np.zeros(values.shape, dtype=np.uint8)
+        for dx, dy in offsets:
+            counts += padded[1 + dx:width + 1 + dx, 1 + dy:height + 1 + dy]
+        return counts
+
+    def checked_neighbor_positions(is_open, x, y):
+        candidates = [(x - 1, y), (x, y - 1), (x, y + 1), (x + 1, y)]
+        return [(nx, ny) for nx, ny in candidates if 0 <= nx < size[0] and 0 <= ny < size[1] and is_open[nx, ny]]
+
+    maze = MazeBoard(size)
+    maze.generate_maze()
+    is_open = ~maze.is_active
+    flat_open = is_open.ravel()
+    cells = [(x, y) for x in range(size[0]) for y in range(size[1])]
+    assert (pad_and_slice_count(board, MOORE) == moore.count(board)).all()
+    assert all(checked_neighbor_positions(is_open, x, y) == [von_neumann.position(j) for j in von_neumann.neighbor_lists[von_neumann.index(x, y)] if flat_open[j]] for x, y in cells)
+
+    results = [
+        ("Life neighbor counts", lambda: pad_and_slice_count(board, MOORE), lambda: moore.count(board)),
+        ("open neighbor counts", lambda: pad_and_slice_count(is_open, VON_NEUMANN), lambda: von_neumann.count(is_open)),
+        ("open neighbors of all 256 cells",
+         lambda: [checked_neighbor_positions(is_open, x, y) for x, y in cells],
+         lambda: [[j for j in neighbors if flat_open[j]] for neighbors in von_neumann.neighbor_lists]),
+    ]
+    print(f"{'query':>32} {'before us':>10} {'topology us':>12} {'speedup':>8}")
+    for name, before, after in results:
+        before_us = time_query(before, args.repeats)
+        after_us = time_query(after, args.repeats)
+        print(f"{name:>32} {before_us:>10.1f} {after_us:>12.1f} {before_us / after_us:>7.1f}x")
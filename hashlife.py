@@ -0,0 +1,327 @@
+import re
+import numpy as np
+
+
+# A square block of the Life universe, 2**level cells on a side. Nodes
+# are hash-consed: a block with the same contents is always the same
+# Node object, so identical regions (and their futures) are shared.
+class Node():
+    __slots__ = ("nw", "ne", "sw", "se", "level", "population")
+
+    def __init__(self, nw, ne, sw, se, level, population):
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.level = level
+        self.population = population
+
+    def __repr__(self):
+        return f"Node(level={self.level}, population={self.population})"
+
+
+# Parse a pattern in the RLE format used by most Life pattern
+# collections and return its living (x, y) cells and its rule
+def parse_rle(text):
+    rule = "B3/S23"
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("x"):
+            match = re.search(r"rule\s*=\s*([^\s,]+)", line)
+            if match:
+                rule = match.group(1)
+            continue
+        lines.append(line)
+
+    cells = []
+    x, y = 0, 0
+    for count, tag in re.findall(r"(\d*)([a-zA-Z$!])", "".join(lines)):
+        count = int(count) if count else 1
+        if tag == "!":
+            break
+        if tag == "$":
+            x, y = 0, y + count
+        elif tag == "b" or tag == ".":
+            x += count
+        else:
+            # Every other letter is a living state
+            cells.extend((x + i, y) for i in range(count))
+            x += count
+    return cells, rule
+
+
+# Parse a rule like "B3/S23" into its birth and survival counts
+def parse_rule(rule):
+    match = re.fullmatch(r"B(\d*)/S(\d*)", rule.upper())
+    if match is None:
+        raise ValueError(f"Only B/S rules are supported, got `{rule}`.")
+    births, survivals = match.groups()
+    return {int(n) for n in births}, {int(n) for n in survivals}
+
+
+# An unbounded Life universe evolved with Gosper's Hashlife algorithm.
+# The universe is a quadtree whose root covers the square starting at
+# `origin`; it grows as the pattern does. Results of advancing a node
+# are memoized, so repetitive patterns can jump huge numbers of
+# generations at once. Once the node cache grows past `max_nodes`,
+# everything not reachable from the current universe is evicted.
+class HashLife():
+
+    def __init__(self, rule="B3/S23", max_nodes=500_000):
+        self.births, self.survivals = parse_rule(rule)
+        self.max_nodes = max_nodes
+        self.nodes = {}
+        self.results = {}
+        self.empty_nodes = []
+        self.off = Node(None, None, None, None, 0, 0)
+        self.on = Node(None, None, None, None, 0, 1)
+        self.root = self.empty(3)
+        self.origin = (-4, -4)
+        self.generation = 0
+
+    @classmethod
+    def from_rle(cls, text, **kwargs):
+        cells, rule = parse_rle(text)
+        life = cls(rule=kwargs.pop("rule", rule), **kwargs)
+        life.set_cells(cells)
+        return life
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path) as f:
+            return cls.from_rle(f.read(), **kwargs)
+
+    # Get the canonical node with these four children
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw, ne, sw, se, nw.level + 1, population)
+            self.nodes[key] = node
+        return node
+
+    # Get the canonical empty node of a given level
+    def empty(self, level):
+        while len(self.empty_nodes) <= level:
+            if not self.empty_nodes:
+                self.empty_nodes.append(self.off)
+            else:
+                e = self.empty_nodes[-1]
+                self.empty_nodes.append(self.join(e, e, e, e))
+        return self.empty_nodes[level]
+
+    # The node one level down sharing this node's center
+    def centre(self, node):
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    # Pad a node with an empty border, doubling its size
+    def expand(self, node):
+        e = self.empty(node.level - 1)
+        return self.join(self.join(e, e, e, node.nw), self.join(e, e, node.ne, e),
+                         self.join(e, node.sw, e, e), self.join(node.se, e, e, e))
+
+    # Advance a level 2 (4x4) node one generation by brute force and
+    # return its 2x2 center
+    def _step_4x4(self, node):
+        cells = np.zeros((4, 4), dtype=np.uint8)
+        for (qy, qx), quad in zip(((0, 0), (0, 2), (2, 0), (2, 2)), (node.nw, node.ne, node.sw, node.se)):
+            cells[qy, qx], cells[qy, qx + 1] = quad.nw.population, quad.ne.population
+            cells[qy + 1, qx], cells[qy + 1, qx + 1] = quad.sw.population, quad.se.population
+        centre = []
+        for y, x in ((1, 1), (1, 2), (2, 1), (2, 2)):
+            num_living_neighbors = cells[y - 1:y + 2, x - 1:x + 2].sum() - cells[y, x]
+            rule = self.survivals if cells[y, x] else self.births
+            centre.append(self.on if num_living_neighbors in rule else self.off)
+        return self.join(*centre)
+
+    # Get the center of a node (one level down) advanced 2**j
+    # generations, where j is at most level - 2
+    def successor(self, node, j):
+        j = min(j, node.level - 2)
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        if node.population == 0:
+            result = node.nw
+        elif node.level == 2:
+            result = self._step_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # The nine overlapping sub-squares one level down
+            c1, c2, c3 = nw, self.join(nw.ne, ne.nw, nw.se, ne.sw), ne
+            c4 = self.join(nw.sw, nw.se, sw.nw, sw.ne)
+            c5 = self.join(nw.se, ne.sw, sw.ne, se.nw)
+            c6 = self.join(ne.sw, ne.se, se.nw, se.ne)
+            c7, c8, c9 = sw, self.join(sw.ne, se.nw, sw.se, se.sw), se
+            squares = (c1, c2, c3, c4, c5, c6, c7, c8, c9)
+            if j < node.level - 2:
+                # Slower than the maximum speed, so only the second
+                # half of the recursion advances time
+                squares = [self.centre(c) for c in squares]
+            else:
+                squares = [self.successor(c, j) for c in squares]
+            c1, c2, c3, c4, c5, c6, c7, c8, c9 = squares
+            result = self.join(self.successor(self.join(c1, c2, c4, c5), j),
+                               self.successor(self.join(c2, c3, c5, c6), j),
+                               self.successor(self.join(c4, c5, c7, c8), j),
+                               self.successor(self.join(c5, c6, c8, c9), j))
+        self.results[key] = result
+        return result
+
+    # Replace the universe with a pattern of living (x, y) cells
+    def set_cells(self, cells):
+        cells = list(cells)
+        if not cells:
+            self.root, self.origin = self.empty(3), (-4, -4)
+            return
+        min_x = min(x for x, _ in cells)
+        min_y = min(y for _, y in cells)
+        pattern = {(x - min_x, y - min_y): self.on for x, y in cells}
+
+        # Pair up the cells into ever larger blocks until one remains
+        level = 0
+        while len(pattern) > 1 or level < 3:
+            e = self.empty(level)
+            next_pattern = {}
+            while pattern:
+                (x, y), _ = next(iter(pattern.items()))
+                x, y = x - (x & 1), y - (y & 1)
+                nw = pattern.pop((x, y), e)
+                ne = pattern.pop((x + 1, y), e)
+                sw = pattern.pop((x, y + 1), e)
+                se = pattern.pop((x + 1, y + 1), e)
+                next_pattern[(x >> 1, y >> 1)] = self.join(nw, ne, sw, se)
+            pattern = next_pattern
+            level += 1
+        self.root = pattern.popitem()[1]
+        self.origin = (min_x, min_y)
+        self.generation = 0
+
+    # Get the living (x, y) cells of the whole universe
+    def get_cells(self):
+        cells = []
+        stack = [(self.root, *self.origin)]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                cells.append((x, y))
+                continue
+            half = 1 << (node.level - 1)
+            stack.extend(((node.nw, x, y), (node.ne, x + half, y),
+                          (node.sw, x, y + half), (node.se, x + half, y + half)))
+        return cells
+
+    @property
+    def population(self):
+        return self.root.population
+
+    # Pad the root by one level, keeping it centered on the same cells
+    def _grow(self):
+        half = 1 << (self.root.level - 1)
+        self.root = self.expand(self.root)
+        self.origin = (self.origin[0] - half, self.origin[1] - half)
+
+    # Drop empty borders so the root stays as small as the pattern allows
+    def _crop(self):
+        while self.root.level > 3 and self.centre(self.root).population == self.root.population:
+            quarter = 1 << (self.root.level - 2)
+            self.root = self.centre(self.root)
+            self.origin = (self.origin[0] + quarter, self.origin[1] + quarter)
+
+    # Advance the universe 2**j generations in a single jump
+    def step_power(self, j):
+        self._crop()
+        # Make room for the pattern to grow before advancing it
+        self._grow()
+        self._grow()
+        while self.root.level < j + 2:
+            self._grow()
+        quarter = 1 << (self.root.level - 2)
+        self.root = self.successor(self.root, j)
+        self.origin = (self.origin[0] + quarter, self.origin[1] + quarter)
+        self.generation += 1 << j
+        if len(self.nodes) > self.max_nodes:
+            self.collect()
+
+    # Advance the universe any number of generations, jumping by
+    # the powers of two that make it up
+    def step(self, generations=1):
+        j = 0
+        while generations:
+            if generations & 1:
+                self.step_power(j)
+            generations >>= 1
+            j += 1
+
+    # Evict every cached node and result that the current universe
+    # doesn't use, bounding the memory used by the cache
+    def collect(self):
+        self.results = {}
+        nodes = {}
+        stack = [self.root, *self.empty_nodes]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in nodes:
+                continue
+            nodes[key] = node
+            stack.extend(key)
+        self.nodes = nodes
+
+    # Copy the living cells inside a window of the universe into
+    # `out` (a (height, width) array), skipping empty blocks entirely
+    def get_region(self, x, y, out):
+        height, width = out.shape
+        out[:] = 0
+        stack = [(self.root, *self.origin)]
+        while stack:
+            node, nx, ny = stack.pop()
+            size = 1 << node.level
+            if (node.population == 0 or nx >= x + width or ny >= y + height
+                    or nx + size <= x or ny + size <= y):
+                continue
+            if node.level == 0:
+                out[ny - y, nx - x] = 1
+                continue
+            half = size >> 1
+            stack.extend(((node.nw, nx, ny), (node.ne, nx + half, ny),
+                          (node.sw, nx, ny + half), (node.se, nx + half, ny + half)))
+        return out
+
+
+# A panel-sized (or tiled canvas sized) window onto a HashLife universe
+class Viewport():
+
+    def __init__(self, life, size=(32, 8), x=0, y=0):
+        self.life = life
+        self.size = size
+        self.x, self.y = x, y
+        self.cells = np.zeros((size[1], size[0]), dtype=np.uint8)
+
+    # Move the window across the universe
+    def pan(self, dx=0, dy=0):
+        self.x += dx
+        self.y += dy
+
+    # Center the window on the middle of the living cells
+    def center_on_pattern(self):
+        cells = self.life.get_cells()
+        if cells:
+            xs, ys = zip(*cells)
+            self.x = (min(xs) + max(xs)) // 2 - self.size[0] // 2
+            self.y = (min(ys) + max(ys)) // 2 - self.size[1] // 2
+
+    # Get the living cells inside the window, indexed [row][column]
+    def get_cells(self):
+        return self.life.get_region(self.x, self.y, self.cells)
+
+    # Get the window as an (height, width, 3) frame
+    def get_frame(self, color=(0, 255, 0)):
+        return self.get_cells()[:, :, None] * np.array(color, dtype=np.uint8)
@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import runpy
+import random
+import subprocess
+import numpy as np
+import clock
+import led_matrix
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Every demo script along with the arguments (and working directory)
+# to run it headless with
+DEMOS = {
+    "render_img": {"script": "2_render_img.py", "args": ["-img", "poker.png"]},
+    "render_banner": {"script": "3_render_banner.py", "args": ["-img", "poker.png"]},
+    "send_message": {"script": "4_send_message.py", "args": ["-m", "DIMMiN says hello!"]},
+    "game_of_life": {"script": "5_conways_game_of_life.py", "args": ["-w", "thread"]},
+    "depth_first_search": {"script": "6_depth_first_search.py", "args": ["-w", "thread"]},
+    "hashlife": {"script": "7_hashlife.py", "args": ["-j", "2", "-dx", "1"]},
+    "overlay": {"script": "8_overlay.py", "args": ["-img", "poker.png", "-l", "-c", "-m", "DIMMiN says hello!"]},
+    "neural_network": {"script": "neural_network.py", "cwd": "neural_networks", "args": [], "torch": True},
+}
+
+
+# Raised from strip.show() once a demo has displayed enough frames
+class FrameLimitReached(Exception):
+    pass
+
+
+# Run a demo script in this process against a headless strip. Every
+# call to strip.show() is a frame: `on_frame(strip)` is called after
+# each one, and the demo is stopped after `frames` of them or once
+# `seconds` have passed on its clock. The demo runs on a virtual clock
+# that skips its sleeps, and the random number generators are seeded,
+# so runs are quick and repeatable. Returns the strip once it stops.
+def run_demo(name, frames=None, seconds=None, on_frame=None, seed=0):
+    demo = DEMOS[name]
+    cwd = os.path.join(ROOT, demo.get("cwd", ""))
+    script = os.path.join(cwd, demo["script"])
+
+    strips = []
+
+    class DemoStrip(led_matrix.HeadlessStrip):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            strips.append(self)
+
+        def show(self):
+            super().show()
+            # Writing to a real strip takes this long as well
+            clock.sleep(1 / led_matrix.MAX_REFRESH_HZ)
+            if on_frame is not None:
+                on_frame(self)
+            if frames is not None and self.num_shows >= frames:
+                raise FrameLimitReached()
+            if seconds is not None and clock.now() >= seconds:
+                raise FrameLimitReached()
+
+    led_matrix.install_headless_strip().Adafruit_NeoPixel = DemoStrip
+    previous_clock = clock.set_clock(clock.VirtualClock())
+
+    random.seed(seed)
+    np.random.seed(seed)
+    if demo.get("torch"):
+        import torch
+        torch.manual_seed(seed)
+
+    argv, path, old_cwd = sys.argv, list(sys.path), os.getcwd()
+    sys.argv = [script, *demo["args"]]
+    sys.path[:0] = [cwd, ROOT]
+    os.chdir(cwd)
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except FrameLimitReached:
+        pass
+    finally:
+        sys.argv, sys.path[:] = argv, path
+        os.chdir(old_cwd)
+        clock.set_clock(previous_clock)
+    return strips[-1] if strips else None
+
+
+# Run a command (usually this interpreter on a profiling script with
+# --child) and parse the JSON it prints on its last line. Failures are
+# returned as {"error": <the last line of stderr>}.
+def run_json_subprocess(command):
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exit code {result.returncode}"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,168 @@
+import sys
+import numpy as np
+
+# Assistance from NeoPixel library strandtest example by Tony DiCola (tony@tonydicola.com)
+# LED strip configuration:
+LED_COUNT      = 256      # Number of LED pixels (32 x 8 = 256).
+LED_PIN        = 18       # GPIO pin connected to the pixels (18 uses PWM!).
+LED_FREQ_HZ    = 800_000  # LED signal frequency in hertz (usually 800khz)
+LED_DMA        = 10       # DMA channel to use for generating signal (try 10)
+LED_BRIGHTNESS = 25       # Set to 0 for darkest and 255 for brightest
+LED_INVERT     = False    # True to invert the signal (when using NPN transistor level shift)
+LED_CHANNEL    = 0        # set to '1' for GPIOs 13, 19, 41, 45 or 53
+
+# The matrix is 32 columns by 8 rows. Frames are stored the same way
+# PIL hands us images: (rows, columns, rgb) with row 0 at the top.
+MATRIX_SIZE = (32, 8)
+FRAME_SHAPE = (MATRIX_SIZE[1], MATRIX_SIZE[0], 3)
+
+# Each LED takes 24 bits at 800kHz plus a ~50us latch, so a full
+# 256 LED refresh takes ~7.7ms no matter how fast we compute frames
+MAX_REFRESH_HZ = 1 / (LED_COUNT * 24 / LED_FREQ_HZ + 50e-6)
+
+
+# Pack an (r, g, b) triple the same way rpi_ws281x.Color does
+def Color(red, green, blue, white=0):
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+# A stand-in for Adafruit_NeoPixel so that the demos can run on a
+# machine without the LED matrix attached (benchmarks, previews, etc.)
+class HeadlessStrip():
+
+    def __init__(self, num=LED_COUNT, pin=LED_PIN, freq_hz=LED_FREQ_HZ, dma=LED_DMA,
+                 invert=LED_INVERT, brightness=LED_BRIGHTNESS, channel=LED_CHANNEL):
+        self.pixels = np.zeros(num, dtype=np.uint32)
+        self.brightness = brightness
+        self.num_shows = 0
+
+    def begin(self):
+        pass
+
+    def numPixels(self):
+        return len(self.pixels)
+
+    def setPixelColor(self, n, color):
+        self.pixels[n] = color
+
+    def setPixelColorRGB(self, n, red, green, blue, white=0):
+        self.pixels[n] = Color(red, green, blue, white)
+
+    def getPixelColor(self, n):
+        return int(self.pixels[n])
+
+    def getPixels(self):
+        return self.pixels
+
+    def setBrightness(self, brightness):
+        self.brightness = brightness
+
+    def getBrightness(self):
+        return self.brightness
+
+    def show(self):
+        self.num_shows += 1
+
+
+# Make `from rpi_ws281x import ...` resolve to the headless strip so
+# the numbered demo scripts can be run unmodified off the Pi
+def install_headless_strip():
+    module = type(sys)("rpi_ws281x")
+    module.Adafruit_NeoPixel = HeadlessStrip
+    module.Color = Color
+    module.__all__ = ["Adafruit_NeoPixel", "Color"]
+    sys.modules["rpi_ws281x"] = module
+    return module
+
+
+# Create, initialize and clear the LED strip
+def create_strip(brightness=LED_BRIGHTNESS, headless=False):
+    if headless:
+        strip = HeadlessStrip(brightness=brightness)
+    else:
+        from rpi_ws281x import Adafruit_NeoPixel
+        strip = Adafruit_NeoPixel(LED_COUNT, LED_PIN, LED_FREQ_HZ,
+                                  LED_DMA, LED_INVERT, brightness,
+                                  LED_CHANNEL)
+    # Intialize the library (must be called once before other functions).
+    strip.begin()
+    for i in range(strip.numPixels()): strip.setPixelColor(i, 0)
+    strip.show()
+    return strip
+
+
+# Get the LED index of every pixel in a frame. The board alternates
+# indices so every other column runs bottom to top, and the first LED
+# sits in the bottom right corner of the frame.
+def wire_index(size=MATRIX_SIZE):
+    columns, rows = size
+    # x / y here are the Board coordinates used by the simulations
+    x = columns - 1 - np.arange(columns)[None, :]
+    y = rows - 1 - np.arange(rows)[:, None]
+    y = np.where(x % 2, rows - 1 - y, y)
+    return x * rows + y
+
+
+# The inverse of wire_index: for each LED, the flat frame
+# position whose color it should show
+def wire_order(size=MATRIX_SIZE):
+    order = np.empty(size[0] * size[1], dtype=np.intp)
+    order[wire_index(size).ravel()] = np.arange(order.size)
+    return order
+
+
+WIRE_ORDER = wire_order()
+# The frame row and column shown by each LED
+WIRE_ROWS, WIRE_COLUMNS = np.divmod(WIRE_ORDER, MATRIX_SIZE[0])
+
+
+# Convert a (32, 8, ...) array indexed [x][y] like Board.state into
+# a frame oriented the same way as the images
+def board_to_frame(board_values):
+    return board_values.swapaxes(0, 1)[::-1, ::-1]
+
+
+# Turn an (8, 32, 3) frame into the packed colors of each LED in
+# the order they sit on the wire. Pass `out` to reuse a buffer
+# instead of allocating a new one every frame.
+def pack_frame(frame, out=None):
+    if out is None:
+        out = np.empty(LED_COUNT, dtype=np.uint32)
+    rgb = frame[WIRE_ROWS, WIRE_COLUMNS]
+    out[:] = rgb[:, 0]
+    out <<= 8
+    out |= rgb[:, 1]
+    out <<= 8
+    out |= rgb[:, 2]
+    return out
+
+
+# The inverse of pack_frame: rebuild the (8, 32, 3) frame shown by
+# the packed colors of each LED, such as HeadlessStrip.pixels
+def unpack_frame(packed, out=None):
+    if out is None:
+        out = np.empty(FRAME_SHAPE, dtype=np.uint8)
+    packed = np.asarray(packed, dtype=np.uint32)
+    out[WIRE_ROWS, WIRE_COLUMNS, 0] = packed >> 16
+    out[WIRE_ROWS, WIRE_COLUMNS, 1] = packed >> 8
+    out[WIRE_ROWS, WIRE_COLUMNS, 2] = packed
+    return out
+
+
+_packed = np.empty(LED_COUNT, dtype=np.uint32)
+
+
+# Write an (8, 32, 3) frame to the strip and display it
+def show_frame(strip, frame):
+    for i, color in enumerate(pack_frame(frame, out=_packed).tolist()):
+        strip.setPixelColor(i, color)
+    strip.show()
+
+
+# Update only the given LEDs, then display them. `colors` is either one
+# packed color for every LED or one packed color per LED.
+def show_changes(strip, leds, colors):
+    colors = np.broadcast_to(colors, np.shape(leds))
+    for i, color in zip(np.asarray(leds).tolist(), colors.tolist()):
+        strip.setPixelColor(i, color)
+    strip.show()
@@ -0,0 +1,150 @@
+import os
+import json
+import colorsys
+import numpy as np
+from collections import deque, Counter
+from board import Board
+from grid_topology import get_topology
+
+# The (dx, dy) offsets of the eight neighbors of a cell
+NEIGHBOR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+SEED_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seeds", "life_seeds.json")
+
+
+# Count the living neighbors of every cell for any number of boards
+# at once. `boards` is a boolean array whose last two axes are the
+# (x, y) cells of a board; cells past the edges count as dead. Shifted
+# slices stream through memory, which beats gathering neighbors from a
+# GridTopology on big boards and batches (a single 32x8 board is the
+# other way around, see LifeBoard.update).
+def count_living_neighbors(boards):
+    width, height = boards.shape[-2:]
+    padding = [(0, 0)] * (boards.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(boards.astype(np.uint8), padding)
+    counts = np.zeros(boards.shape, dtype=np.uint8)
+    for dx, dy in NEIGHBOR_OFFSETS:
+        counts += padded[..., 1 + dx:width + 1 + dx, 1 + dy:height + 1 + dy]
+    return counts
+
+
+# Advance every board one generation:
+# 1) Any live cell with two or three live neighbours survives.
+# 2) Any dead cell with three live neighbours becomes a live cell.
+# 3) All other live cells die in the next generation. Similarly, all other dead cells stay dead.
+def step_boards(boards):
+    counts = count_living_neighbors(boards)
+    return (counts == 3) | (boards & (counts == 2))
+
+
+# Pack boards into bytes (one bit per cell) so they can be compared,
+# hashed and stored compactly
+def pack_boards(boards):
+    flat = boards.reshape(*boards.shape[:-2], -1)
+    return np.packbits(flat, axis=-1)
+
+
+def unpack_board(packed, size=(32, 8)):
+    bits = np.unpackbits(np.frombuffer(bytes(packed), dtype=np.uint8))
+    return bits[:size[0] * size[1]].reshape(size).astype(bool)
+
+
+# Load the ranked seeds written by seed_search.py as (32, 8) boolean
+# boards, most interesting first
+def load_seed_library(path=SEED_LIBRARY_PATH):
+    with open(path) as f:
+        library = json.load(f)
+    size = tuple(library["size"])
+    return [unpack_board(bytes.fromhex(seed["cells"]), size) for seed in library["seeds"]]
+
+
+# Map the color to an integer based on any number of things
+# (Total number of living cells,
+#  number of days this individual cell was alive,
+#  total number of neighbors this cell has,
+#  etc.)
+def map_color_to_int(integer_value, min_value=0, max_value=256):
+    normalized_value = (integer_value - min_value) / (max_value - min_value)
+    hue = 0.67 * normalized_value
+    rgb = colorsys.hsv_to_rgb(hue,1,1)
+    return [int(val*255) for val in rgb]
+
+
+# A board for Conway's Game of Life, where the active cells are the
+# living ones
+class LifeBoard(Board):
+
+    def __init__(self, size=(32, 8), seed_library=None):
+        super().__init__(size=size)
+        self.seed_library = seed_library
+        self.color[:] = map_color_to_int(0)
+
+    # Come up with an initial configuration of cells
+    def start_life(self, style="random"):
+        if style == "library":
+            # Start from one of the pre-vetted long lived seeds
+            self.is_active[:] = self.seed_library[np.random.randint(len(self.seed_library))]
+            self.steps_alive[:] = 0
+
+        if style == "random":
+            # Strike life into every cell where a 1 is randomly selected
+            self.is_active ^= np.random.randint(2, size=self.size).astype(bool)
+
+        if style == "blinker":
+            self.stamp([[1], [1], [1]], 14, 3, flip=True)
+
+        if style == "toad":
+            self.stamp([[0, 1], [1, 1], [1, 1], [1, 0]], 13, 3, flip=True)
+
+        if style == "penta-decathlon":
+            self.stamp(np.ones((8, 3)), 13, 2, flip=True)
+
+    # Update the next state based on the following rules:
+    # 1) Any live cell with two or three live neighbours survives.
+    # 2) Any dead cell with three live neighbours becomes a live cell.
+    # 3) All other live cells die in the next generation. Similarly, all other dead cells stay dead.
+    def update(self):
+        # Count the total number of living cells on the board
+        num_living_cells = self.count()
+
+        num_living_neighbors = get_topology(self.size, "moore").count(self.is_active)
+        survives = self.is_active & ((num_living_neighbors == 2) | (num_living_neighbors == 3))
+        born = ~self.is_active & (num_living_neighbors == 3)
+
+        self.steps_alive += 1
+        self.steps_alive[self.is_active & ~survives] = 0
+        self.steps_alive[~self.is_active & ~born] -= 1
+        self.is_active = survives | born
+        self.color[:] = map_color_to_int(num_living_cells)
+
+
+# Play the game forever, yielding each generation as a frame along
+# with how long (ms) it should stay on the display
+def simulate(style, seed_library=None, wait_ms=100):
+    b = LifeBoard(seed_library=seed_library)
+    b.start_life(style=style)
+    yield b.get_frame(), 1_000
+
+    # Track the history so we can terminate at repeating endstates. The
+    # counts of each state in the history are kept up to date as states
+    # come and go, rather than recounted every generation.
+    history_len = 500
+    history = deque([b.get_state_int()])
+    state_counts = Counter(history)
+
+    while True:
+        b.update()
+        yield b.get_frame(), wait_ms
+        state = b.get_state_int()
+        if len(history) == history_len:
+            state_counts[history.popleft()] -= 1
+        history.append(state)
+        state_counts[state] += 1
+        if state_counts[state] == 20:
+            b.start_life(style=style)
+            # Show the new seed for as long as the first one
+            yield b.get_frame(), 1_000
+            # Reset the history
+            history_len = 100
+            history = deque([b.get_state_int()])
+            state_counts = Counter(history)
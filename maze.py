@@ -0,0 +1,119 @@
+import random
+import numpy as np
+from board import Board
+from grid_topology import get_topology
+
+
+# A board whose active cells are walls that a Depth First Search
+# has to find its way around
+class MazeBoard(Board):
+
+    def __init__(self, size=(32, 8)):
+        super().__init__(size=size)
+        self.is_active[:] = True
+        self.color[:] = (255, 255, 255)
+
+    # Count the open neighbors of every cell at once
+    def count_open_neighbors(self):
+        return get_topology(self.size, "von_neumann").count(~self.is_active | self.is_goal)
+
+    def carve_passage(self, x, y):
+        """ Recursive function that carves a path to help generate a maze """
+        walls = self.is_active.reshape(-1)
+        topology = get_topology(self.size, "carve")
+        # Every cell's jumps, with the ones off the board left in so the
+        # directions are shuffled the same way as always
+        jumps = topology.neighbors.tolist()
+
+        def carve(i):
+            walls[i] = False
+            directions = jumps[i]
+            random.shuffle(directions)
+            for j in directions:
+                if j < topology.num_cells and walls[j]:
+                    # On a flat index the cell between two others is
+                    # their average
+                    walls[(i + j) // 2] = False
+                    carve(j)
+
+        carve(topology.index(x, y))
+
+    # Generate a maze for our DFS algo to traverse
+    def generate_maze(self):
+        """ Generate maze starting from (start_x, start_y) """
+        self.carve_passage(0,0)
+
+        ### HACKY SOLUTION - Randomize edge states to complete the maze
+        self.is_active[:, -1] = np.random.choice([0,1], size=self.size[0], p=[0.3, 0.7])
+        self.is_active[-1, :] = np.random.choice([0,1], size=self.size[1], p=[0.3, 0.7])
+
+        # Ensure end point (bottom-right corner) is a path
+        self.is_active[-1, -1] = False
+        self.is_active[-2, -1] = False
+
+        # Turn any cell that has no neighbors into a wall
+        self.is_active[self.count_open_neighbors() == 0] = True
+
+    # Select a random open cell
+    def random_open_position(self):
+        xs, ys = np.nonzero(~self.is_active)
+        i = np.random.randint(len(xs))
+        return int(xs[i]), int(ys[i])
+
+    # Mark a cell as visited and color it in
+    def visit(self, x, y, color):
+        self.is_active[x, y] = True
+        self.visited[x, y] = True
+        self.color[x, y] = color
+
+    # Mark the start and goal, then return a generator that applies the
+    # Depth First Search Algorithm to solve this problem one step at a time
+    def search(self, start_x=0, start_y=0, goal_x=31, goal_y=7):
+        #(255, 155, 0)
+        # Initialize the goal marker
+        self.is_active[goal_x, goal_y] = True
+        self.is_goal[goal_x, goal_y] = True
+        self.color[goal_x, goal_y] = (0, 255, 0)
+        # Set the attributes of the starting point
+        self.visit(start_x, start_y, (255, 0, 0))
+        return self.search_steps(start_x, start_y, goal_x, goal_y)
+
+    # Yield the (current, next) positions after every step of the DFS
+    def search_steps(self, start_x, start_y, goal_x, goal_y):
+        # The search runs on flat cell indices
+        topology = get_topology(self.size, "von_neumann")
+        neighbor_lists = topology.neighbor_lists
+        is_active, is_goal = self.is_active.reshape(-1), self.is_goal.reshape(-1)
+        visited, color = self.visited.reshape(-1), self.color.reshape(-1, 3)
+        current, goal = topology.index(start_x, start_y), topology.index(goal_x, goal_y)
+        stack = []
+        while current != goal:
+            # Choose the next point to explore from your list of neighbors
+            stack.extend(j for j in neighbor_lists[current] if not is_active[j] or is_goal[j])
+            next_cell = stack.pop()
+            # Visit the next cell, and display the current one as visited
+            is_active[next_cell] = visited[next_cell] = True
+            color[next_cell] = (255, 0, 0)
+            is_active[current] = visited[current] = True
+            color[current] = (255, 155, 0)
+            yield topology.position(current), topology.position(next_cell)
+
+            # Set the current position to this next position
+            current = next_cell
+
+
+# Generate and solve mazes forever, yielding every frame along with
+# how long (ms) it should stay on the display
+def solve_mazes(wait_ms=0):
+    while True:
+        b = MazeBoard()
+        b.generate_maze()
+        yield b.get_frame(), 100
+        # Select a random start and end position
+        start_x, start_y = b.random_open_position()
+        goal_x, goal_y = b.random_open_position()
+        # Apply the DFS algo
+        steps = b.search(start_x=start_x, start_y=start_y, goal_x=goal_x, goal_y=goal_y)
+        yield b.get_frame(), 100
+        for _ in steps:
+            yield b.get_frame(), wait_ms
@@ -0,0 +1,122 @@
+import gc
+import sys
+import json
+import time
+import resource
+import argparse
+import tracemalloc
+import numpy as np
+from headless import DEMOS, run_demo, run_json_subprocess
+
+# The most memory (bytes) each demo's render path may allocate per
+# frame, at the 95th percentile, before --check fails. Frames still
+# create the list of 256 packed colors handed to setPixelColor, plus
+# whatever small NumPy temporaries the simulation needs. A still image
+# is only rendered once, so render_img is reported but not budgeted.
+FRAME_BUDGETS = {
+    "render_banner": 16_000,
+    "send_message": 16_000,
+    "game_of_life": 48_000,
+    "depth_first_search": 32_000,
+    "hashlife": 48_000,
+    "overlay": 32_000,
+    "neural_network": 64_000,
+}
+
+parser = argparse.ArgumentParser(
+    prog="MemoryProfile",
+    description="Report allocations per frame, peak RSS and GC pauses for each demo, run headless",
+)
+parser.add_argument("demos", nargs="*", help="The demos to profile (defaults to all of them).", default=list(DEMOS))
+parser.add_argument("-f", "--frames", type=int, help="The number of frames to profile each demo for.", default=300)
+parser.add_argument("-wu", "--warmup", type=int, help="The number of frames to skip before measuring.", default=20)
+parser.add_argument("--check", action="store_true", help="Exit with an error if any demo goes over its per-frame allocation budget.")
+parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+
+
+# Profile a single demo in this process and return its measurements
+def profile_demo(name, frames, warmup):
+    frame_allocations = []
+    gc_pauses = []
+    gc_started = []
+
+    # Only collections after the warmup count, not the ones from imports
+    def on_gc(phase, info):
+        if phase == "start":
+            gc_started.append(time.perf_counter())
+        elif gc_started:
+            pause = time.perf_counter() - gc_started.pop()
+            if len(frame_allocations) > warmup:
+                gc_pauses.append(pause)
+
+    # The high-water mark of traced memory during a frame, above where
+    # it stood when the frame started, is what that frame allocated
+    frame_start = [0]
+    def on_frame(strip):
+        current, peak = tracemalloc.get_traced_memory()
+        frame_allocations.append(peak - frame_start[0])
+        tracemalloc.reset_peak()
+        frame_start[0] = current
+
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    try:
+        run_demo(name, frames=frames + warmup, on_frame=on_frame)
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+
+    # Demos that show fewer frames than the warmup (like a still
+    # image) are measured on everything after clearing the strip
+    measured = frame_allocations[warmup:] if len(frame_allocations) > warmup else frame_allocations[1:]
+    allocations = np.array(measured or [0])
+    pauses = np.array(gc_pauses or [0]) * 1_000
+    return {
+        "demo": name,
+        "frames": len(measured),
+        "alloc_mean_bytes": float(allocations.mean()),
+        "alloc_p95_bytes": float(np.percentile(allocations, 95)),
+        "alloc_max_bytes": int(allocations.max()),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1_024,
+        "gc_collections": len(gc_pauses),
+        "gc_pause_max_ms": float(pauses.max()),
+        "gc_pause_total_ms": float(pauses.sum()),
+    }
+
+
+# Profile a demo in a fresh interpreter so its peak RSS is its own
+def profile_in_subprocess(name, frames, warmup):
+    command = [sys.executable, __file__, name, "-f", str(frames), "-wu", str(warmup), "--child"]
+    return run_json_subprocess(command)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(profile_demo(args.demos[0], args.frames, args.warmup)))
+        sys.exit(0)
+
+    print(f"{'demo':>20} {'frames':>6} {'mean B':>8} {'p95 B':>8} {'max B':>8} {'budget':>8} {'RSS MB':>7} {'GCs':>5} {'GC max ms':>9}")
+    over_budget = []
+    failed = []
+    for name in args.demos:
+        r = profile_in_subprocess(name, args.frames, args.warmup)
+        if "error" in r:
+            print(f"{name:>20} failed: {r['error']}")
+            failed.append(name)
+            continue
+        budget = FRAME_BUDGETS.get(name)
+        if budget is not None and r["alloc_p95_bytes"] > budget:
+            over_budget.append(name)
+        print(f"{name:>20} {r['frames']:>6} {r['alloc_mean_bytes']:>8.0f} {r['alloc_p95_bytes']:>8.0f} {r['alloc_max_bytes']:>8} "
+              f"{budget or '-':>8} {r['peak_rss_mb']:>7.1f} {r['gc_collections']:>5} {r['gc_pause_max_ms']:>9.2f}")
+
+    if over_budget:
+        print(f"Over their per-frame allocation budget: {', '.join(over_budget)}")
+    # A demo that can't run at all can't be shown to be within budget
+    if failed:
+        print(f"Failed to run: {', '.join(failed)}")
+    if args.check and (over_budget or failed):
+        sys.exit(1)
@@ -0,0 +1,103 @@
+import io
+import json
+import time
+import argparse
+import numpy as np
+import torch
+import torchvision.datasets as datasets
+from network import Network, quantize_network
+
+parser = argparse.ArgumentParser(
+    prog="BenchmarkNetworks",
+    description="Compare the latency, throughput and accuracy of each network architecture in float32 and int8.",
+)
+parser.add_argument("-n", "--networks", type=int, nargs="+", help="The network architectures to benchmark.", default=[0, 1, 2, 3])
+parser.add_argument("-b", "--batch-sizes", type=int, nargs="+", help="The batch sizes to measure throughput at.", default=[1, 16, 64, 256, 1024])
+parser.add_argument("-r", "--repeats", type=int, help="The number of single samples to time for the latency.", default=500)
+parser.add_argument("-t", "--threads", type=int, help="The number of threads torch may use (0 keeps torch's default).", default=0)
+parser.add_argument("-o", "--output", type=str, help="Write the results to this JSON file as well.", default=None)
+args = parser.parse_args()
+
+if args.threads:
+    torch.set_num_threads(args.threads)
+
+# Load the whole MNIST test set as one normalized tensor, the same
+# values transforms.Normalize((0.5,), (0.5,)) produces
+mnist_testset = datasets.MNIST(root='./data', train=False, download=True)
+test_images = (mnist_testset.data.float() / 255 - 0.5) / 0.5
+test_labels = mnist_testset.targets
+
+
+# The size of a model's weights once saved
+def model_size_kb(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1_024
+
+
+# Time forward_details on single samples, the way the visualizer runs
+def latency_ms(model, repeats):
+    times = []
+    for sample in test_images[:repeats]:
+        start = time.perf_counter()
+        model.forward_details(sample)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1_000, np.percentile(times, 99) * 1_000
+
+
+# Samples per second when evaluating the test set in batches
+def throughput(model, batch_size):
+    num_samples = max(batch_size, min(len(test_images), batch_size * 50))
+    start = time.perf_counter()
+    for i in range(0, num_samples, batch_size):
+        model(test_images[i:i + batch_size])
+    return num_samples / (time.perf_counter() - start)
+
+
+def accuracy(model):
+    predictions = torch.cat([model(batch).argmax(dim=1) for batch in test_images.split(1_000)])
+    return (predictions == test_labels).float().mean().item()
+
+
+if __name__ == "__main__":
+    results = []
+    with torch.no_grad():
+        for n in args.networks:
+            model = torch.load(f"./models/network_{n}.pth", weights_only=False)
+            model.eval()
+            layer_sizes = [layer.out_features for layer in model.network if isinstance(layer, torch.nn.Linear)]
+            float_accuracy = None
+            for precision, net in (("float32", model), ("int8", quantize_network(model))):
+                median_ms, p99_ms = latency_ms(net, args.repeats)
+                result = {
+                    "network": n,
+                    "layers": layer_sizes,
+                    "precision": precision,
+                    "size_kb": model_size_kb(net),
+                    "latency_ms": median_ms,
+                    "latency_p99_ms": p99_ms,
+                    "throughput": {batch_size: throughput(net, batch_size) for batch_size in args.batch_sizes},
+                    "accuracy": accuracy(net),
+                }
+                if float_accuracy is None:
+                    float_accuracy = result["accuracy"]
+                result["accuracy_delta"] = result["accuracy"] - float_accuracy
+                results.append(result)
+
+    header = f"{'net':>3} {'precision':>9} {'size kB':>8} {'latency ms':>10} {'p99 ms':>7} {'accuracy':>8} {'delta':>7}"
+    header += "".join(f" {f'b={b} /s':>10}" for b in args.batch_sizes)
+    print(header)
+    for r in results:
+        row = f"{r['network']:>3} {r['precision']:>9} {r['size_kb']:>8.1f} {r['latency_ms']:>10.3f} {r['latency_p99_ms']:>7.3f} {r['accuracy']:>8.4f} {r['accuracy_delta']:>+7.4f}"
+        row += "".join(f" {r['throughput'][b]:>10.0f}" for b in args.batch_sizes)
+        print(row)
+
+    # The visualizer needs a single sample evaluated well within one
+    # frame, so report the fastest combination that keeps its accuracy
+    best = min((r for r in results if r["accuracy_delta"] > -0.01), key=lambda r: r["latency_ms"])
+    print(f"Fastest within 1% of float32 accuracy: network_{best['network']} ({best['precision']}), "
+          f"{best['latency_ms']:.3f} ms per sample ({1_000 / best['latency_ms']:.0f} evaluations/s)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
@@ -1,3 +1,4 @@
+import torch
 import torch.nn as nn
 
 class Network(nn.Module):
@@ -40,4 +41,30 @@ class Network(nn.Module):
         for layer in self.network:
             x = layer(x)
             self.layer_outputs.append(x)  # Save the output at this step
-        return x
\ No newline at end of file
+        return x
+
+    # Train with SGD on (normalized images, labels) batches, yielding
+    # the loss and accuracy of each batch once its step is taken. The
+    # optimizer lives as long as the generator, so pass every epoch's
+    # batches through one call to keep the momentum going.
+    def train_steps(self, batches, learning_rate=0.01, momentum=0.9):
+        optimizer = torch.optim.SGD(self.parameters(), lr=learning_rate, momentum=momentum)
+        loss_function = nn.CrossEntropyLoss()
+        self.train()
+        for images, labels in batches:
+            optimizer.zero_grad()
+            outputs = self(images)
+            loss = loss_function(outputs, labels)
+            loss.backward()
+            optimizer.step()
+            yield loss.item(), (outputs.argmax(dim=1) == labels).float().mean().item()
+
+# Get a copy of a network whose Linear layers store int8 weights and
+# quantize their inputs on the fly. The copy is still a Network, so
+# forward_details exposes the (float) output of every layer as before.
+def quantize_network(network):
+    # fbgemm is only built for x86, the Raspberry Pi uses qnnpack
+    engines = torch.backends.quantized.supported_engines
+    if "fbgemm" not in engines and "qnnpack" in engines:
+        torch.backends.quantized.engine = "qnnpack"
+    return torch.ao.quantization.quantize_dynamic(network, {nn.Linear}, dtype=torch.qint8)
@@ -0,0 +1,178 @@
+import os
+import sys
+import gzip
+import time
+import shutil
+import signal
+import argparse
+import multiprocessing as mp
+import numpy as np
+import torch
+# Checkpoints are pickled Networks, the same as the saved models
+from network import Network
+
+# The shared modules (like demos.py) live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from led_matrix import MAX_REFRESH_HZ, create_strip
+from demos import network_frame
+from frame_queue import LatestFrameSampler
+from frame_pipeline import add_pipeline_arguments, run_pipeline, tee
+
+parser = argparse.ArgumentParser(
+    prog="TrainLive",
+    description="Train a neural network on MNIST in a background process and watch its neurons learn on the LED matrix.",
+)
+parser.add_argument("-l", "--layers", type=int, nargs="+", help="The sizes of the hidden layers of a new network.", default=[32, 16])
+parser.add_argument("-r", "--resume", type=str, help="Keep training this saved network instead of a new one.", default=None)
+parser.add_argument("-o", "--output", type=str, help="Where to save the network after every epoch and when stopped.", default="./models/network_live.pth")
+parser.add_argument("-e", "--epochs", type=int, help="The number of passes over the training set. 0 trains until stopped.", default=10)
+parser.add_argument("-b", "--batch-size", type=int, help="The number of images per SGD step.", default=64)
+parser.add_argument("-lr", "--learning-rate", type=float, help="The SGD learning rate.", default=0.01)
+parser.add_argument("-p", "--probe", type=int, help="The test image whose neurons are shown while training.", default=0)
+parser.add_argument("-f", "--fps", type=int, help="The number of snapshots of the probe shown a second.", default=30)
+parser.add_argument("-rp", "--report", type=float, help="Print the training progress every this many seconds.", default=5)
+add_pipeline_arguments(parser)
+args = parser.parse_args()
+
+# MNIST's idx files start with a big-endian header: the magic number
+# and the size of each dimension
+IDX_HEADER_BYTES = {"images-idx3-ubyte": 16, "labels-idx1-ubyte": 8}
+
+# The shared training stats, as indices into a small array of doubles
+STEP, EPOCH, LOSS, ACCURACY, TEST_ACCURACY = range(5)
+
+
+# Map MNIST's raw idx files into memory instead of loading them, so
+# training only pages in the images its batches use and every process
+# shares the one copy in the page cache. The files are unpacked (or
+# downloaded by torchvision) into the usual ./data/MNIST/raw first.
+def mnist_memmap(root="./data", train=True):
+    raw = os.path.join(root, "MNIST", "raw")
+    arrays = []
+    for kind, header_bytes in IDX_HEADER_BYTES.items():
+        path = os.path.join(raw, f"{'train' if train else 't10k'}-{kind}")
+        if not os.path.exists(path) and not os.path.exists(path + ".gz"):
+            import torchvision.datasets as datasets
+            datasets.MNIST(root=root, train=train, download=True)
+        if not os.path.exists(path):
+            with gzip.open(path + ".gz", "rb") as packed, open(path, "wb") as unpacked:
+                shutil.copyfileobj(packed, unpacked)
+        arrays.append(np.memmap(path, dtype=np.uint8, mode="r", offset=header_bytes))
+    images, labels = arrays
+    return images.reshape(-1, 28, 28), labels
+
+
+# Normalized the same as transforms.Normalize((0.5,), (0.5,))
+def normalize(images):
+    return (torch.from_numpy(np.asarray(images, dtype=np.float32)) / 255 - 0.5) / 0.5
+
+
+# Shuffled (images, labels) batches, epoch after epoch. Each batch is
+# read in index order so the memory map is walked forward.
+def shuffled_batches(images, labels, batch_size, epochs):
+    epoch = 0
+    while not epochs or epoch < epochs:
+        order = np.random.permutation(len(labels))
+        for start in range(0, len(order), batch_size):
+            batch = np.sort(order[start:start + batch_size])
+            yield normalize(images[batch]), torch.from_numpy(labels[batch].astype(np.int64))
+        epoch += 1
+
+
+# The share of the test set the network gets right
+def test_accuracy(model, images, labels, batch_size=1_000):
+    correct = 0
+    with torch.no_grad():
+        for start in range(0, len(labels), batch_size):
+            predictions = model(normalize(images[start:start + batch_size])).argmax(dim=1)
+            correct += int((predictions.numpy() == labels[start:start + batch_size]).sum())
+    return correct / len(labels)
+
+
+# Runs in the training process: train the network as fast as it can
+# and yield a frame of the probe's neurons at most `fps` times a second,
+# writing the stats to `stats` alongside it. Snapshots only cost one
+# forward pass of a single image, and the frames go out through shared
+# memory that the display reads on its own schedule, so training never
+# waits on the display.
+def train(model, train_set, test_set, stats, fps):
+    # Stopping is up to the display process, which saves a checkpoint
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Leave a core for the display
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) - 1))
+
+    images, labels = train_set
+    probe = normalize(test_set[0][args.probe])
+    steps_per_epoch = -(-len(labels) // args.batch_size)
+    snapshot_time = 1 / fps
+    next_snapshot = time.perf_counter()
+    loss = accuracy = None
+    step = saved_step = 0
+
+    def publish_stats():
+        with stats.get_lock():
+            stats[STEP], stats[EPOCH], stats[LOSS], stats[ACCURACY] = step, step / steps_per_epoch, loss, accuracy
+
+    try:
+        batches = shuffled_batches(images, labels, args.batch_size, args.epochs)
+        for batch_loss, batch_accuracy in model.train_steps(batches, learning_rate=args.learning_rate):
+            step += 1
+            # Smoothed over the last hundred or so batches
+            loss = batch_loss if loss is None else 0.99 * loss + 0.01 * batch_loss
+            accuracy = batch_accuracy if accuracy is None else 0.99 * accuracy + 0.01 * batch_accuracy
+
+            if step % steps_per_epoch == 0:
+                stats[TEST_ACCURACY] = test_accuracy(model, *test_set)
+                torch.save(model, args.output)
+                saved_step = step
+
+            if time.perf_counter() >= next_snapshot:
+                with torch.no_grad():
+                    model.forward_details(probe)
+                publish_stats()
+                next_snapshot = time.perf_counter() + snapshot_time
+                yield network_frame(model.layer_outputs)
+    finally:
+        if step:
+            publish_stats()
+        if step != saved_step:
+            torch.save(model, args.output)
+
+
+# Create, initialize and clear the LED strip (see led_matrix.py for its configuration)
+strip = create_strip(brightness=1)
+
+if __name__ == "__main__":
+    model = torch.load(args.resume, weights_only=False) if args.resume else Network(*args.layers)
+    # Mapped (and downloaded if needed) up front, then shared with the
+    # training process when it forks
+    train_set, test_set = mnist_memmap(train=True), mnist_memmap(train=False)
+    print(f"Training on {len(train_set[1])} images, showing test image {args.probe} (a {test_set[1][args.probe]})")
+
+    stats = mp.get_context("fork").Array("d", 5)
+    stats[TEST_ACCURACY] = float("nan")
+    started = time.perf_counter()
+    last_report = [started, 0]
+
+    # Print the progress every so often, as frames go by
+    def report(frame, wait_ms):
+        now = time.perf_counter()
+        if now - last_report[0] < args.report:
+            return
+        with stats.get_lock():
+            step, epoch, loss, accuracy, tested = stats[:]
+        steps_per_second = (step - last_report[1]) / (now - last_report[0])
+        last_report[:] = now, step
+        print(f"step {step:,.0f} (epoch {epoch:.2f}): loss {loss:.3f}, accuracy {accuracy:.3f}, "
+              f"test accuracy {tested:.3f}, {steps_per_second:,.0f} steps/s")
+
+    fps = min(args.fps, MAX_REFRESH_HZ)
+    try:
+        with LatestFrameSampler(lambda: train(model, train_set, test_set, stats, fps)) as sampler:
+            run_pipeline(tee(((frame, 0) for frame in sampler.frames(fps=fps)), report), strip, args)
+    except KeyboardInterrupt:
+        pass
+
+    step, epoch, loss, accuracy, tested = stats[:]
+    print(f"Trained {step:,.0f} steps ({epoch:.2f} epochs) in {time.perf_counter() - started:.0f} s, "
+          f"test accuracy {tested:.3f}. Saved to {args.output}")
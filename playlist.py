@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import clock
+import signal
+import argparse
+import threading
+from led_matrix import create_strip
+from demos import DEMO_TYPES
+from frame_pipeline import add_pipeline_arguments, run_pipeline
+
+parser = argparse.ArgumentParser(
+    prog="Playlist",
+    description="Rotate between demos in one process, with every demo loaded ahead of time so switching takes a single frame",
+)
+parser.add_argument("demos", nargs="*", help=f"The demos to play, in order. Includes {', '.join(f'`{name}`' for name in DEMO_TYPES)}.", default=list(DEMO_TYPES))
+parser.add_argument("-d", "--duration", type=float, help="The time (s) each demo plays for before switching to the next one. 0 only switches on SIGUSR1.", default=30)
+parser.add_argument("-br", "--brightness", type=int, help="The brightness of the display, 0 is darkest and 255 is brightest.", default=25)
+add_pipeline_arguments(parser)
+args = parser.parse_args()
+
+
+# Plays warm demos one after another. Every demo keeps its next frame
+# computed, so a switch only changes which demo the next frame comes
+# from and the handoff happens on the very next frame.
+class Playlist():
+
+    def __init__(self, demos, duration=30):
+        self.demos = list(demos)
+        self.duration = duration
+        self.current = 0
+        self.switch_to = None
+        # Set to cut the current frame's hold short for a switch (pass
+        # it to play() as `wake`)
+        self.wake = threading.Event()
+
+    # Switch to the named demo (or the next one) on the next frame
+    def request_switch(self, name=None):
+        names = [demo.name for demo in self.demos]
+        self.switch_to = names.index(name) if name is not None else (self.current + 1) % len(self.demos)
+        self.wake.set()
+
+    # Yield the frames of whichever demo is playing, forever. A demo
+    # works out its next frame once its last one has been shown, and no
+    # frame is held past the demo's turn.
+    def frames(self):
+        for demo in self.demos:
+            demo.warm()
+        started = clock.now()
+        while True:
+            if self.switch_to is None and self.duration and clock.now() - started >= self.duration:
+                self.switch_to = (self.current + 1) % len(self.demos)
+            if self.switch_to is not None:
+                self.current, self.switch_to = self.switch_to, None
+                self.wake.clear()
+                started = clock.now()
+
+            demo = self.demos[self.current]
+            frame, hold_ms = demo.pending
+            if self.duration:
+                hold_ms = max(0, min(hold_ms, (self.duration - (clock.now() - started)) * 1_000))
+            yield frame, hold_ms
+            demo.advance()
+
+
+# Create and warm up every demo, leaving out any that can't be loaded
+# here (like the neural network without torch)
+def load_demos(names):
+    demos = []
+    for name in names:
+        start = time.perf_counter()
+        try:
+            demo = DEMO_TYPES[name]()
+            demo.warm()
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        print(f"Loaded {name} in {(time.perf_counter() - start) * 1_000:.0f} ms")
+        demos.append(demo)
+    return demos
+
+
+# Create, initialize and clear the LED strip (see led_matrix.py for its configuration)
+strip = create_strip(brightness=args.brightness)
+
+if __name__ == "__main__":
+    demos = load_demos(args.demos)
+    if not demos:
+        sys.exit("None of the demos could be loaded")
+    playlist = Playlist(demos, duration=args.duration)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: playlist.request_switch())
+    print(f"Playing, run `kill -USR1 {os.getpid()}` to switch to the next demo")
+    run_pipeline(playlist.frames(), strip, args, wake=playlist.wake)
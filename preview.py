@@ -0,0 +1,76 @@
+import argparse
+import numpy as np
+from PIL import Image
+import clock
+from led_matrix import unpack_frame
+from headless import DEMOS, run_demo
+
+parser = argparse.ArgumentParser(
+    prog="Preview",
+    description="Run a demo headless on a virtual clock and save what the matrix would show as an animated GIF or PNG",
+)
+parser.add_argument("demo", type=str, choices=list(DEMOS), help="The demo to preview.")
+parser.add_argument("-o", "--output", type=str, help="The file to write, a .gif or an (animated) .png.", default=None)
+parser.add_argument("-t", "--seconds", type=float, help="The length of the preview (s) on the demo's clock.", default=10)
+parser.add_argument("-f", "--frames", type=int, help="Stop after this many frames, even if the time isn't up.", default=None)
+parser.add_argument("-fps", type=int, help="The number of times a second the strip is sampled for the preview.", default=50)
+parser.add_argument("-sc", "--scale", type=int, help="The size (px) of each LED in the preview.", default=10)
+parser.add_argument("-seed", type=int, help="The seed for the random number generators.", default=0)
+
+
+# Turn what a strip showed, as (show_time, frame) pairs in seconds,
+# into (frame, duration_ms) pairs at its true timing up to `end`. The
+# strip is sampled `fps` times a second like a camera would (a 130 Hz
+# strip shows more frames than a GIF can), and repeats are merged into
+# longer frames.
+def resample(shows, end, fps=50):
+    show_times = np.array([shown for shown, _ in shows])
+    samples = np.arange(show_times[0], max(end, show_times[-1] + 1 / fps), 1 / fps)
+    # The frame on the strip at each sample is the last one shown
+    visible = np.searchsorted(show_times, samples, side="right") - 1
+
+    recorded = []
+    last_index = None
+    for index in visible.tolist():
+        frame = shows[index][1]
+        if index == last_index or (recorded and np.array_equal(recorded[-1][0], frame)):
+            recorded[-1][1] += 1_000 / fps
+        else:
+            recorded.append([frame, 1_000 / fps])
+        last_index = index
+    return [(frame, duration_ms) for frame, duration_ms in recorded]
+
+
+# Run a demo on a virtual clock and record what the strip showed
+def record_demo(name, seconds=10, frames=None, fps=50, seed=0):
+    shows = []
+    run_demo(name, frames=frames, seconds=seconds, seed=seed,
+             on_frame=lambda strip: shows.append((clock.now(), unpack_frame(strip.pixels))))
+    return resample(shows, seconds or 0, fps=fps) if shows else []
+
+
+# Save recorded frames as an animation, each LED `scale` pixels wide.
+# Holds are capped at a minute, the longest an animated PNG can store.
+def save_preview(recorded, path, scale=10):
+    def scaled(frame):
+        return Image.fromarray(frame.repeat(scale, axis=0).repeat(scale, axis=1))
+
+    durations = [min(60_000, round(duration_ms)) for _, duration_ms in recorded]
+    if len(recorded) == 1:
+        scaled(recorded[0][0]).save(path)
+    else:
+        # The scaled images are made as they are written, not all at once
+        append_images = (scaled(frame) for frame, _ in recorded[1:])
+        scaled(recorded[0][0]).save(path, save_all=True, append_images=append_images, duration=durations, loop=0)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    output = args.output or f"{args.demo}.gif"
+    recorded = record_demo(args.demo, seconds=args.seconds, frames=args.frames, fps=args.fps, seed=args.seed)
+    if not recorded:
+        print(f"{args.demo} didn't show anything")
+    else:
+        save_preview(recorded, output, scale=args.scale)
+        total_s = sum(duration_ms for _, duration_ms in recorded) / 1_000
+        print(f"Saved {len(recorded)} frames ({total_s:.1f} s) of {args.demo} to {output}")
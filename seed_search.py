@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from life import SEED_LIBRARY_PATH, step_boards, pack_boards
+
+parser = argparse.ArgumentParser(
+    prog="SeedSearch",
+    description="Search random Game of Life seeds for ones that stay interesting for a long time",
+)
+parser.add_argument("-n", "--num-seeds", type=int, help="The number of random seeds to simulate.", default=20_000)
+parser.add_argument("-g", "--generations", type=int, help="The most generations to simulate each seed for.", default=1_000)
+parser.add_argument("-p", "--max-period", type=int, help="The longest oscillator period to look for.", default=60)
+parser.add_argument("-d", "--density", type=float, help="The chance that each cell starts alive.", default=0.5)
+parser.add_argument("-k", "--keep", type=int, help="The number of top seeds to keep in the library.", default=200)
+parser.add_argument("-w", "--workers", type=int, help="The number of worker processes.", default=os.cpu_count())
+parser.add_argument("-c", "--chunk", type=int, help="The number of seeds each worker simulates at once.", default=1_000)
+parser.add_argument("-r", "--random-seed", type=int, help="The seed for the random number generator.", default=0)
+parser.add_argument("-o", "--output", type=str, help="Where to write the seed library.", default=SEED_LIBRARY_PATH)
+
+
+# Simulate a batch of seeds side by side as one (num_seeds, 32, 8) array.
+# Each board runs until it repeats an earlier state, giving:
+#   lifespan: the generation at which its final cycle starts
+#   period:   the length of that cycle (1 for still lifes and dead boards)
+#   population: the number of living cells at the start, peak and end
+# Boards that never repeat within `generations` get a period of 0.
+def simulate_seeds(seeds, generations=1_000, max_period=60):
+    num_seeds = len(seeds)
+    lifespan = np.full(num_seeds, generations)
+    period = np.zeros(num_seeds, dtype=int)
+    peak_population = seeds.sum(axis=(1, 2))
+    final_population = np.zeros(num_seeds, dtype=int)
+
+    # Compare boards through their packed bits viewed as 4 uint64s
+    history = np.zeros((max_period, num_seeds, 4), dtype=np.uint64)
+    history[0] = pack_boards(seeds).view(np.uint64)
+    unsettled = np.ones(num_seeds, dtype=bool)
+    boards = seeds
+    for generation in range(1, generations + 1):
+        boards = step_boards(boards)
+        population = boards.sum(axis=(1, 2))
+        np.maximum(peak_population, population, out=peak_population, where=unsettled)
+        packed = pack_boards(boards).view(np.uint64)
+        for p in range(1, min(generation, max_period) + 1):
+            repeated = unsettled & (packed == history[(generation - p) % max_period]).all(axis=1)
+            if repeated.any():
+                lifespan[repeated] = generation - p
+                period[repeated] = p
+                final_population[repeated] = population[repeated]
+                unsettled &= ~repeated
+        if not unsettled.any():
+            break
+        history[generation % max_period] = packed
+    final_population[unsettled] = population[unsettled]
+
+    return lifespan, period, peak_population, final_population
+
+
+# Generate and simulate one chunk of random seeds (runs in a worker)
+def search_chunk(random_seed, num_seeds, density=0.5, size=(32, 8), generations=1_000, max_period=60):
+    rng = np.random.default_rng(random_seed)
+    seeds = rng.random((num_seeds, *size)) < density
+    lifespan, period, peak, final = simulate_seeds(seeds, generations=generations, max_period=max_period)
+    return pack_boards(seeds), seeds.sum(axis=(1, 2)), lifespan, period, peak, final
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    size = (32, 8)
+
+    start = time.time()
+    chunks = [min(args.chunk, args.num_seeds - i) for i in range(0, args.num_seeds, args.chunk)]
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(search_chunk, (args.random_seed, i), n, density=args.density, size=size,
+                        generations=args.generations, max_period=args.max_period)
+            for i, n in enumerate(chunks)
+        ]
+        for future in futures:
+            results.append(future.result())
+    cells, initial, lifespan, period, peak, final = (np.concatenate(column) for column in zip(*results))
+    elapsed = time.time() - start
+    print(f"Simulated {args.num_seeds} seeds in {elapsed:.1f}s ({args.num_seeds / elapsed:.0f} seeds/s)")
+
+    # Rank the longest lived seeds first, preferring ones that
+    # settle into an oscillator rather than a still life
+    ranking = np.lexsort((-final, -period, -lifespan))[:args.keep]
+    library = {
+        "size": list(size),
+        "generations": args.generations,
+        "density": args.density,
+        "seeds": [
+            {
+                "cells": cells[i].tobytes().hex(),
+                "lifespan": int(lifespan[i]),
+                "period": int(period[i]),
+                "initial_population": int(initial[i]),
+                "peak_population": int(peak[i]),
+                "final_population": int(final[i]),
+            }
+            for i in ranking
+        ],
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(library, f, indent=1)
+
+    print(f"Median lifespan: {np.median(lifespan):.0f} generations")
+    print(f"Kept {len(ranking)} seeds with lifespans of {lifespan[ranking].min()}-{lifespan[ranking].max()} generations in {args.output}")
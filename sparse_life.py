@@ -0,0 +1,169 @@
+import time
+import argparse
+import numpy as np
+from collections import Counter, deque
+from life import NEIGHBOR_OFFSETS, LifeBoard, step_boards
+from led_matrix import MATRIX_SIZE
+
+
+# Conway's Game of Life that only re-evaluates the cells that changed
+# last generation and their neighbors, so a generation costs time in
+# proportion to the activity on the board rather than its area.
+#
+# Cells live in a flat array with a one cell dead border around the
+# board, which lets every neighbor lookup be a plain offset without
+# bounds checks. Like Board, cells past the edges count as dead.
+class SparseLife():
+
+    def __init__(self, size=MATRIX_SIZE):
+        self.size = size
+        width, height = size
+        self.stride = height + 2
+        self.alive = np.zeros((width + 2) * self.stride, dtype=np.uint8)
+        self.offsets = np.array([dx * self.stride + dy for dx, dy in NEIGHBOR_OFFSETS])
+        self.offsets_and_self = np.append(self.offsets, 0)
+
+        # Which padded positions are on the board, and the board index
+        # (x * height + y) of each of them
+        padded = np.arange(self.alive.size).reshape(width + 2, self.stride)
+        self.on_board = np.zeros(self.alive.size, dtype=bool)
+        self.on_board[padded[1:-1, 1:-1].ravel()] = True
+        self.board_index = np.full(self.alive.size, -1)
+        self.board_index[padded[1:-1, 1:-1].ravel()] = np.arange(width * height)
+        self.padded_index = padded[1:-1, 1:-1].ravel()
+
+        # The cells that changed last generation
+        self.changed = np.zeros(0, dtype=np.intp)
+        self.generation = 0
+
+    # Replace the board with a (width, height) boolean array
+    def set_board(self, board):
+        self.alive[:] = 0
+        self.alive[self.padded_index] = np.asarray(board, dtype=bool).ravel()
+        # Everything alive is new, so all of it needs evaluating
+        self.changed = self.padded_index[np.flatnonzero(board)]
+
+    def get_board(self):
+        return self.alive[self.padded_index].reshape(self.size).astype(bool)
+
+    @property
+    def population(self):
+        return int(self.alive.sum())
+
+    # Advance one generation and return the board indices (x * height + y)
+    # of the cells that were born and the cells that died
+    def step(self):
+        # Only cells next to a change can change themselves
+        candidates = np.unique((self.changed[:, None] + self.offsets_and_self).ravel())
+        candidates = candidates[self.on_board[candidates]]
+
+        counts = np.zeros(len(candidates), dtype=np.uint8)
+        for offset in self.offsets:
+            counts += self.alive[candidates + offset]
+        was_alive = self.alive[candidates].astype(bool)
+        is_alive = (counts == 3) | (was_alive & (counts == 2))
+
+        flipped = is_alive != was_alive
+        self.changed = candidates[flipped]
+        self.alive[self.changed] ^= 1
+        self.generation += 1
+
+        born = self.board_index[candidates[flipped & is_alive]]
+        died = self.board_index[candidates[flipped & was_alive]]
+        return born, died
+
+
+# Play the game forever in one color, yielding frames like simulate()
+# does. Only the pixels of the cells that were born or died are redrawn,
+# so with the pipeline's diff stage only those LEDs are rewritten. The
+# board is reseeded (in `style`) once it settles into a repeating state.
+def simulate_sparse(style, seed_library=None, color=(0, 255, 0), wait_ms=100, size=MATRIX_SIZE):
+    width, height = size
+    # Where each board index (x * height + y) lands in the frame, the
+    # same as board_to_frame
+    x, y = np.divmod(np.arange(width * height), height)
+    rows, cols = height - 1 - y, width - 1 - x
+
+    seeder = LifeBoard(size=size, seed_library=seed_library)
+    life = SparseLife(size)
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def reseed():
+        seeder.is_active[:] = False
+        seeder.start_life(style=style)
+        life.set_board(seeder.is_active)
+        frame[:] = 0
+        alive = np.flatnonzero(seeder.is_active)
+        frame[rows[alive], cols[alive]] = color
+        return Counter([life.alive.tobytes()])
+
+    history_len = 500
+    state_counts = reseed()
+    history = deque(state_counts)
+    yield frame, 1_000
+
+    while True:
+        born, died = life.step()
+        frame[rows[born], cols[born]] = color
+        frame[rows[died], cols[died]] = 0
+        yield frame, wait_ms
+        state = life.alive.tobytes()
+        if len(history) == history_len:
+            state_counts[history.popleft()] -= 1
+        history.append(state)
+        state_counts[state] += 1
+        if state_counts[state] == 20:
+            history_len = 100
+            state_counts = reseed()
+            history = deque(state_counts)
+            yield frame, 1_000
+
+
+# Stamp a square grid of `count` gliders, `spacing` cells apart, in
+# the middle of a board
+def gliders(size, count=16, spacing=16):
+    board = np.zeros(size, dtype=bool)
+    per_row = int(np.ceil(np.sqrt(count)))
+    x0 = (size[0] - per_row * spacing) // 2
+    y0 = (size[1] - per_row * spacing) // 2
+    for i in range(count):
+        x = x0 + (i % per_row) * spacing
+        y = y0 + (i // per_row) * spacing
+        board[x + 1, y] = board[x + 2, y + 1] = True
+        board[x, y + 2] = board[x + 1, y + 2] = board[x + 2, y + 2] = True
+    return board
+
+
+# Time the average generation (ms) of an engine over `generations`
+def time_generations(step, generations):
+    start = time.perf_counter()
+    for _ in range(generations):
+        step()
+    return (time.perf_counter() - start) / generations * 1_000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="SparseLifeBenchmark",
+        description="Compare the sparse incremental Game of Life against the dense update on sparse patterns",
+    )
+    parser.add_argument("-g", "--generations", type=int, help="The number of generations to time.", default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", help="The side lengths of the square boards to test.", default=[64, 256, 1024, 4096])
+    parser.add_argument("--gliders", type=int, help="The number of gliders on every board.", default=16)
+    args = parser.parse_args()
+
+    print(f"{'board':>12} {'gliders':>8} {'dense ms':>10} {'sparse ms':>10} {'speedup':>8}")
+    for side in args.sizes:
+        size = (side, side)
+        board = gliders(size, count=args.gliders)
+
+        dense = [board]
+        def dense_step():
+            dense[0] = step_boards(dense[0])
+        sparse = SparseLife(size)
+        sparse.set_board(board)
+
+        dense_ms = time_generations(dense_step, args.generations)
+        sparse_ms = time_generations(sparse.step, args.generations)
+        assert (sparse.get_board() == dense[0]).all(), "The sparse and dense boards diverged"
+        print(f"{side:>5}x{side:<6} {args.gliders:>8} {dense_ms:>10.3f} {sparse_ms:>10.3f} {dense_ms / sparse_ms:>7.1f}x")
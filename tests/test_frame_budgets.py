@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# The demos and their tools live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from memory_profile import FRAME_BUDGETS, profile_in_subprocess
+
+
+# Each render path has to stay within its per-frame allocation budget,
+# measured the same way as `memory_profile.py --check`
+@pytest.mark.parametrize("name", list(FRAME_BUDGETS))
+def test_frame_allocations_within_budget(name):
+    result = profile_in_subprocess(name, frames=300, warmup=20)
+    assert "error" not in result, f"{name} failed to run: {result.get('error')}"
+    assert result["alloc_p95_bytes"] <= FRAME_BUDGETS[name], (
+        f"{name} allocated {result['alloc_p95_bytes']:.0f} bytes per frame (p95), over its budget of {FRAME_BUDGETS[name]}")